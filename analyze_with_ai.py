@@ -44,161 +44,97 @@ to external AI services before running this script.
 
 import os
 import sys
-import json
+import time
+import asyncio
+import hashlib
 import argparse
+import functools
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+import orjson
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+from openai.types.chat import ChatCompletion
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to the character heuristic
+    tiktoken = None
 
 # Load environment from .env file in current directory or parent
 load_dotenv()
 
-class PCAPAIAnalyzer:
-    """AI-powered PCAP analysis using Azure OpenAI"""
-    
-    def __init__(self, analysis_dir: str, model_override: str = None):
-        """Initialize the analyzer with comprehensive error handling"""
-        
-        # Validate analysis directory
-        if not analysis_dir:
-            raise ValueError("Analysis directory path cannot be empty")
-        
-        self.analysis_dir = Path(analysis_dir)
-        
-        if not self.analysis_dir.exists():
-            raise FileNotFoundError(f"Analysis directory not found: {analysis_dir}")
-        
-        if not self.analysis_dir.is_dir():
-            raise NotADirectoryError(f"Path is not a directory: {analysis_dir}")
-        
-        if not os.access(self.analysis_dir, os.R_OK):
-            raise PermissionError(f"Cannot read analysis directory (permission denied): {analysis_dir}")
-        
-        # Check for required analysis files
-        required_files = ['summary.json', 'errors_detailed.json']
-        missing_files = []
-        for filename in required_files:
-            filepath = self.analysis_dir / filename
-            if not filepath.exists():
-                missing_files.append(filename)
-        
-        if missing_files:
-            raise FileNotFoundError(
-                f"Missing required analysis files in {analysis_dir}: {', '.join(missing_files)}\n"
-                f"Run 'prepare_for_ai_analysis.py' first to generate these files."
-            )
-        
-        # Initialize Azure OpenAI client
-        self.endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-        self.api_key = os.getenv("AZURE_OPENAI_API_KEY")
-        
-        # Validate credentials
-        if not self.endpoint:
-            raise ValueError(
-                "Azure OpenAI endpoint not found.\n"
-                "Set AZURE_OPENAI_ENDPOINT environment variable or add to .env file"
-            )
-        
-        if not self.api_key:
-            raise ValueError(
-                "Azure OpenAI API key not found.\n"
-                "Set AZURE_OPENAI_API_KEY environment variable or add to .env file"
-            )
-        
-        # Validate endpoint format
-        if not self.endpoint.startswith(('http://', 'https://')):
-            raise ValueError(f"Invalid endpoint URL format: {self.endpoint}")
-        
-        # Allow model override or use GPT_5_CHAT_MODEL by default (better for analysis)
-        if model_override:
-            self.model = model_override
-        else:
-            self.model = os.getenv("GPT_5_CHAT_MODEL", "gpt-5-chat")
-        
-        # Initialize OpenAI client
-        try:
-            self.client = OpenAI(
-                api_key=self.api_key,
-                base_url=f"{self.endpoint}/openai/v1/"
-            )
-        except Exception as e:
-            raise RuntimeError(f"Failed to initialize Azure OpenAI client: {e}")
-        
-        print(f"✅ Initialized Azure OpenAI client")
-        print(f"   Endpoint: {self.endpoint}")
-        print(f"   Model: {self.model}")
-    
-    def load_analysis_files(self):
-        """Load all analysis files"""
-        files = {
-            'summary': self.analysis_dir / 'summary.json',
-            'errors': self.analysis_dir / 'errors_detailed.json',
-            'conversations': self.analysis_dir / 'conversations.json',
-            'stats': self.analysis_dir / 'quick_stats.txt'
-        }
-        
-        data = {}
-        
-        for key, filepath in files.items():
-            if not filepath.exists():
-                print(f"⚠️  Warning: {filepath} not found")
-                continue
-            
-            if filepath.suffix == '.json':
-                with open(filepath, 'r') as f:
-                    data[key] = json.load(f)
-            else:
-                with open(filepath, 'r') as f:
-                    data[key] = f.read()
-        
-        return data
-    
-    def estimate_tokens(self, text: str) -> int:
-        """Rough token estimation"""
-        return len(text) // 4
-    
-    def create_analysis_prompt(self, data: dict, focus: str = "general") -> str:
-        """Create a focused analysis prompt"""
-        
-        summary = data.get('summary', {})
-        errors = data.get('errors', {})
-        conversations = data.get('conversations', [])
-        
-        # Build context-aware prompt based on focus
-        if focus == "errors":
-            prompt = f"""# Network Packet Capture Analysis - Error Focus
+# Concurrent focus requests share one multiplexed connection over HTTP/2
+# when the optional h2 package is installed (pip install h2)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Write buffer for saved analyses so each file is flushed in a single syscall
+OUTPUT_BUFFER_SIZE = 1 << 17
+
+# Automatic retries for rate-limited (429), timed-out, connection and 5xx
+# failures; the SDK backs off exponentially with jitter and honours Retry-After
+DEFAULT_MAX_RETRIES = 2
+
+# Seconds between status checks while waiting for a batch job to finish
+BATCH_POLL_INTERVAL = 30
+
+# Prompt size budget; leaves room for the largest completion within a
+# 128K context window (gpt-5-chat)
+MAX_PROMPT_TOKENS = 100_000
+
+# Largest sample of each error list used by any prompt; lists are truncated
+# to these sizes on load so no prompt embeds more than it needs
+ERROR_SAMPLE_LIMITS = {
+    'tcp_resets': 10,
+    'tcp_retransmissions': 20,
+    'dns_failures': 30,
+    'http_errors': 5,
+    'connection_failures': 10,
+    'large_packets': 5
+}
+
+# Characters of each saved analysis embedded in a comparison prompt
+COMPARISON_EXCERPT_CHARS = 4000
+
+# Conversations are written busiest first; prompts embed at most this many
+CONVERSATION_SAMPLE_LIMIT = 10
+
+# Analysis prompt templates, filled by str.format_map() with the serialized
+# sections from PCAPAIAnalyzer._prompt_fields()
+_ERRORS_TEMPLATE = """# Network Packet Capture Analysis - Error Focus
 
 ## Capture Overview
-- **Total Packets**: {summary.get('metadata', {}).get('total_packets', 'N/A'):,}
-- **File Size**: {summary.get('metadata', {}).get('file_size_mb', 'N/A'):.2f} MB
-- **Source**: {summary.get('metadata', {}).get('source_file', 'N/A')}
+- **Total Packets**: {total_packets}
+- **File Size**: {file_size_mb} MB
+- **Source**: {source_file}
 
 ## Error Summary
-{json.dumps(summary.get('error_summary', {}), indent=2)}
+{error_summary}
 
 ## Top Sources
-{json.dumps(summary.get('top_sources', [])[:5], indent=2)}
+{top_sources}
 
 ## Top Destinations
-{json.dumps(summary.get('top_destinations', [])[:5], indent=2)}
+{top_destinations}
 
 ## Top Destination Ports
-{json.dumps(summary.get('top_ports', {}).get('destination', [])[:10], indent=2)}
+{top_destination_ports}
 
 ## Critical Errors
 
 ### TCP Resets (Sample)
-{json.dumps(errors.get('tcp_resets', [])[:10], indent=2)}
+{tcp_resets}
 
 ### TCP Retransmissions (Sample)
-{json.dumps(errors.get('tcp_retransmissions', [])[:10], indent=2)}
+{tcp_retransmissions}
 
 ### DNS Failures (Sample)
-{json.dumps(errors.get('dns_failures', [])[:10], indent=2)}
+{dns_failures}
 
 ### HTTP Errors (Sample)
-{json.dumps(errors.get('http_errors', [])[:5], indent=2)}
+{http_errors}
 
 ## Analysis Request
 
@@ -213,23 +149,22 @@ This is from an **Azure AKS production escalation**. Based on the network captur
 
 Provide specific evidence from the packet data and actionable recommendations."""
 
-        elif focus == "performance":
-            prompt = f"""# Network Performance Analysis
+_PERFORMANCE_TEMPLATE = """# Network Performance Analysis
 
 ## Capture Overview
-- **Total Packets**: {summary.get('metadata', {}).get('total_packets', 'N/A'):,}
-- **Protocol Distribution**: {json.dumps(summary.get('protocol_distribution', {}), indent=2)}
+- **Total Packets**: {total_packets}
+- **Protocol Distribution**: {protocol_distribution}
 
 ## Performance Indicators
 
 ### Retransmissions
-{json.dumps(errors.get('tcp_retransmissions', [])[:20], indent=2)}
+{tcp_retransmissions_extended}
 
 ### Top Conversations
-{json.dumps(conversations[:10], indent=2)}
+{conversations}
 
 ### TCP Flags Distribution
-{json.dumps(summary.get('tcp_flags_distribution', {}), indent=2)}
+{tcp_flags_distribution}
 
 ## Analysis Request
 
@@ -241,18 +176,17 @@ Analyze the network performance:
 4. **Connection Quality**: What's the quality of TCP connections?
 5. **Recommendations**: How can performance be improved?"""
 
-        elif focus == "dns":
-            prompt = f"""# DNS Resolution Analysis
+_DNS_TEMPLATE = """# DNS Resolution Analysis
 
 ## DNS Statistics
-- **Total DNS Queries**: {len(summary.get('top_dns_queries', []))}
-- **DNS Failures**: {len(errors.get('dns_failures', []))}
+- **Total DNS Queries**: {dns_query_count}
+- **DNS Failures**: {dns_failure_count}
 
 ## Top DNS Queries
-{json.dumps(summary.get('top_dns_queries', [])[:20], indent=2)}
+{top_dns_queries}
 
 ## DNS Failures
-{json.dumps(errors.get('dns_failures', [])[:30], indent=2)}
+{dns_failures_extended}
 
 ## Analysis Request
 
@@ -263,17 +197,16 @@ Analyze DNS issues:
 3. **Impact Analysis**: How do DNS issues affect the application?
 4. **Resolution**: What needs to be fixed?"""
 
-        else:  # general
-            prompt = f"""# Comprehensive Network Packet Capture Analysis
+_GENERAL_TEMPLATE = """# Comprehensive Network Packet Capture Analysis
 
 ## Executive Summary
-{json.dumps(summary, indent=2)}
+{summary}
 
-## Detailed Errors
-{json.dumps(errors, indent=2)}
+## Detailed Errors (Sample)
+{errors}
 
 ## Top Conversations
-{json.dumps(conversations[:10], indent=2)}
+{conversations}
 
 ## Analysis Request
 
@@ -288,84 +221,328 @@ This is from an **Azure AKS production escalation**. Provide a comprehensive ana
 7. **Actionable Recommendations**: Step-by-step troubleshooting plan with priorities
 
 Be specific and reference actual data from the capture."""
-        
-        return prompt
+
+_TEMPLATES = {
+    'errors': _ERRORS_TEMPLATE,
+    'performance': _PERFORMANCE_TEMPLATE,
+    'dns': _DNS_TEMPLATE,
+    'general': _GENERAL_TEMPLATE
+}
+
+@functools.lru_cache(maxsize=1)
+def _azure_config() -> tuple:
+    """Read and validate the Azure OpenAI endpoint and API key"""
+    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+    api_key = os.getenv("AZURE_OPENAI_API_KEY")
     
-    def analyze(self, focus: str = "general", save_output: bool = True) -> dict:
-        """Run AI analysis on the PCAP data"""
+    # Validate credentials
+    if not endpoint:
+        raise ValueError(
+            "Azure OpenAI endpoint not found.\n"
+            "Set AZURE_OPENAI_ENDPOINT environment variable or add to .env file"
+        )
+    
+    if not api_key:
+        raise ValueError(
+            "Azure OpenAI API key not found.\n"
+            "Set AZURE_OPENAI_API_KEY environment variable or add to .env file"
+        )
+    
+    # Validate endpoint format
+    if not endpoint.startswith(('http://', 'https://')):
+        raise ValueError(f"Invalid endpoint URL format: {endpoint}")
+    
+    return endpoint, api_key
+
+@functools.lru_cache(maxsize=1)
+def _make_client(endpoint: str, api_key: str, max_retries: int) -> OpenAI:
+    """Create the process-wide Azure OpenAI client"""
+    # The SDK's default HTTP client keeps a pooled, keep-alive connection set;
+    # only the protocol is changed here
+    return OpenAI(
+        api_key=api_key,
+        base_url=f"{endpoint}/openai/v1/",
+        max_retries=max_retries,
+        http_client=DefaultHttpxClient(http2=HTTP2_AVAILABLE)
+    )
+
+class PCAPAIAnalyzer:
+    """AI-powered PCAP analysis using Azure OpenAI"""
+    
+    def __init__(self, analysis_dir: str, model_override: str = None, use_cache: bool = True,
+                 max_retries: int = DEFAULT_MAX_RETRIES):
+        """Initialize the analyzer with comprehensive error handling"""
         
-        print(f"\n{'='*80}")
-        print(f"AI-POWERED PCAP ANALYSIS - {focus.upper()} FOCUS")
-        print(f"{'='*80}\n")
+        # Validate analysis directory
+        if not analysis_dir:
+            raise ValueError("Analysis directory path cannot be empty")
         
-        # Load data
-        print("📂 Loading analysis data...")
-        data = self.load_analysis_files()
+        self.analysis_dir = Path(analysis_dir)
+        self.cache_dir = self.analysis_dir / '.cache'
+        self.use_cache = use_cache
+        self._data = None
+        self._fields = None
+        self._fields_source = None
         
-        if not data:
-            print("❌ No analysis data found. Run prepare_for_ai_analysis.py first.")
-            return {}
+        if not self.analysis_dir.exists():
+            raise FileNotFoundError(f"Analysis directory not found: {analysis_dir}")
         
-        print(f"✅ Loaded {len(data)} data files")
+        if not self.analysis_dir.is_dir():
+            raise NotADirectoryError(f"Path is not a directory: {analysis_dir}")
         
-        # Create prompt
-        print(f"🔍 Creating {focus} analysis prompt...")
-        prompt = self.create_analysis_prompt(data, focus)
+        if not os.access(self.analysis_dir, os.R_OK):
+            raise PermissionError(f"Cannot read analysis directory (permission denied): {analysis_dir}")
         
-        # Estimate tokens
-        estimated_tokens = self.estimate_tokens(prompt)
-        estimated_cost = (estimated_tokens / 1_000_000) * 0.150 + (2000 / 1_000_000) * 0.600
+        # Check for required analysis files
+        required_files = ['summary.json', 'errors_detailed.json']
+        missing_files = []
+        for filename in required_files:
+            filepath = self.analysis_dir / filename
+            if not filepath.exists():
+                missing_files.append(filename)
         
-        print(f"📊 Token estimate: ~{estimated_tokens:,}")
-        print(f"💰 Estimated cost: ${estimated_cost:.4f}")
-        print(f"🤖 Calling Azure OpenAI ({self.model})...")
-        print("   This may take 30-60 seconds for reasoning models...\n")
+        if missing_files:
+            raise FileNotFoundError(
+                f"Missing required analysis files in {analysis_dir}: {', '.join(missing_files)}\n"
+                f"Run 'prepare_for_ai_analysis.py' first to generate these files."
+            )
         
-        try:
-            # Call Azure OpenAI
-            # Use appropriate parameters based on model type
-            kwargs = {
-                "model": self.model,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are an expert network and Azure/Kubernetes troubleshooting engineer. Analyze network packet captures to identify root causes, patterns, and provide actionable recommendations."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            }
-            
-            # Reasoning models (gpt-5, gpt-5-mini) require max_completion_tokens
-            # and support reasoning_effort parameter for better output quality
-            if 'gpt-5-mini' in self.model or self.model == 'gpt-5':
-                kwargs["max_completion_tokens"] = 16000  # Increased significantly for reasoning models
+        # Azure OpenAI credentials (validated once per process)
+        self.endpoint, self.api_key = _azure_config()
+        
+        # Allow model override or use GPT_5_CHAT_MODEL by default (better for analysis)
+        if model_override:
+            self.model = model_override
+        else:
+            self.model = os.getenv("GPT_5_CHAT_MODEL", "gpt-5-chat")
+        
+        # Reasoning models (gpt-5, gpt-5-mini) require max_completion_tokens
+        # and support reasoning_effort parameter for better output quality
+        self._is_reasoning = 'gpt-5-mini' in self.model or self.model == 'gpt-5'
+        if self._is_reasoning:
+            self._token_kwargs = {
+                "max_completion_tokens": 16000,  # Increased significantly for reasoning models
                 # Set reasoning_effort to encourage comprehensive visible output
                 # Options: minimal, low, medium, high (default: medium for balance)
-                kwargs["reasoning_effort"] = "medium"  # Balance between speed and quality
+                "reasoning_effort": "medium"  # Balance between speed and quality
                 # Don't set temperature for reasoning models - they handle it internally
+            }
+        else:
+            # Chat models use max_tokens and support temperature
+            self._token_kwargs = {
+                "max_tokens": 4000,  # Increased for detailed analysis
+                "temperature": 0.7
+            }
+        
+        # Exact prompt token counts when tiktoken is installed (deployment names
+        # may not be known to tiktoken, so fall back to the GPT-5 family encoding)
+        self._encoding = None
+        if tiktoken:
+            try:
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.model)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                # e.g. the BPE file cannot be downloaded on an offline machine
+                self._encoding = None
+                print(f"⚠️  tiktoken unavailable, using estimated token counts: {e}")
+        
+        # Initialize OpenAI clients (async client is used for concurrent multi-focus runs).
+        # The sync client and its connection pool are shared by every analyzer in the
+        # process; the async client stays per instance because its connections are
+        # bound to the event loop of each asyncio.run().
+        try:
+            self.client = _make_client(self.endpoint, self.api_key, max_retries)
+            self.aclient = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=f"{self.endpoint}/openai/v1/",
+                max_retries=max_retries,
+                http_client=DefaultAsyncHttpxClient(http2=HTTP2_AVAILABLE)
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to initialize Azure OpenAI client: {e}")
+        
+        print(f"✅ Initialized Azure OpenAI client")
+        print(f"   Endpoint: {self.endpoint}")
+        print(f"   Model: {self.model}")
+        print(f"   Protocol: {'HTTP/2' if HTTP2_AVAILABLE else 'HTTP/1.1'}")
+        print(f"   Retries: {max_retries}")
+    
+    def load_analysis_files(self):
+        """Load all analysis files"""
+        files = {
+            'summary': self.analysis_dir / 'summary.json',
+            'errors': self.analysis_dir / 'errors_detailed.json',
+            'conversations': self.analysis_dir / 'conversations.json',
+            'stats': self.analysis_dir / 'quick_stats.txt'
+        }
+        
+        present = []
+        for key, filepath in files.items():
+            if filepath.exists():
+                present.append((key, filepath))
             else:
-                # Chat models use max_tokens and support temperature
-                kwargs["max_tokens"] = 4000  # Increased for detailed analysis
-                kwargs["temperature"] = 0.7
-            
-            response = self.client.chat.completions.create(**kwargs)
-            
-            # Extract response
-            content = response.choices[0].message.content
+                print(f"⚠️  Warning: {filepath} not found")
+        
+        # Files are independent, so read and parse them concurrently
+        with ThreadPoolExecutor(max_workers=len(files)) as executor:
+            results = executor.map(self._read_one, present)
+        
+        return dict(result for result in results if result)
+    
+    def _read_one(self, item: tuple):
+        """Read and parse one analysis file; returns (key, data) or None if it vanished"""
+        key, filepath = item
+        try:
+            if filepath.suffix != '.json':
+                return key, filepath.read_text(encoding='utf-8')
+            parsed = orjson.loads(filepath.read_bytes())
+        except FileNotFoundError:
+            print(f"⚠️  Warning: {filepath} not found")
+            return None
+        
+        if key == 'errors':
+            parsed = {
+                name: entries[:ERROR_SAMPLE_LIMITS[name]] if name in ERROR_SAMPLE_LIMITS else entries
+                for name, entries in parsed.items()
+            }
+        elif key == 'conversations':
+            parsed = parsed[:CONVERSATION_SAMPLE_LIMIT]
+        return key, parsed
+    
+    def _load_once(self) -> dict:
+        """Load and parse the analysis files on first use and reuse them afterwards"""
+        if self._data is None:
+            print("📂 Loading analysis data...")
+            self._data = self.load_analysis_files()
             
-            # Handle reasoning models that might not return visible content
-            if not content or content.strip() == "":
-                # Check if this is a reasoning model with hidden reasoning
-                if (response.usage and 
-                    hasattr(response.usage, 'completion_tokens_details') and
-                    response.usage.completion_tokens_details and
-                    hasattr(response.usage.completion_tokens_details, 'reasoning_tokens') and
-                    response.usage.completion_tokens_details.reasoning_tokens > 0):
-                    reasoning_tokens = response.usage.completion_tokens_details.reasoning_tokens
-                    content = f"""⚠️ **Reasoning Model Output Issue**
+            if not self._data:
+                print("❌ No analysis data found. Run prepare_for_ai_analysis.py first.")
+            else:
+                print(f"✅ Loaded {len(self._data)} data files")
+        
+        return self._data
+    
+    def estimate_tokens(self, text: str) -> int:
+        """Count prompt tokens with tiktoken, or estimate them when unavailable"""
+        if self._encoding:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return len(text) // 4
+    
+    def _prompt_fields(self, data: dict) -> dict:
+        """Serialize prompt sections once per dataset so every focus reuses them"""
+        if self._fields_source is not data:
+            self._fields = self._build_fields(data)
+            self._fields_source = data
+        return self._fields
+    
+    def _build_fields(self, data: dict) -> dict:
+        """Slice and serialize every section the prompt templates embed"""
+        summary = data.get('summary', {})
+        errors = data.get('errors', {})
+        conversations = data.get('conversations', [])
+        metadata = summary.get('metadata', {})
+        total_packets = metadata.get('total_packets', 'N/A')
+        file_size_mb = metadata.get('file_size_mb', 'N/A')
+        
+        # Compact JSON: indentation costs tokens and adds nothing for the model
+        def dump(obj):
+            return orjson.dumps(obj).decode()
+        
+        return {
+            'total_packets': f"{total_packets:,}" if isinstance(total_packets, int) else total_packets,
+            'file_size_mb': f"{file_size_mb:.2f}" if isinstance(file_size_mb, (int, float)) else file_size_mb,
+            'source_file': metadata.get('source_file', 'N/A'),
+            'summary': dump(summary),
+            'errors': dump(errors),
+            'error_summary': dump(summary.get('error_summary', {})),
+            'protocol_distribution': dump(summary.get('protocol_distribution', {})),
+            'tcp_flags_distribution': dump(summary.get('tcp_flags_distribution', {})),
+            'top_sources': dump(summary.get('top_sources', [])[:5]),
+            'top_destinations': dump(summary.get('top_destinations', [])[:5]),
+            'top_destination_ports': dump(summary.get('top_ports', {}).get('destination', [])[:10]),
+            'top_dns_queries': dump(summary.get('top_dns_queries', [])[:20]),
+            'dns_query_count': len(summary.get('top_dns_queries', [])),
+            'dns_failure_count': summary.get('error_summary', {}).get('dns_failures', len(errors.get('dns_failures', []))),
+            'tcp_resets': dump(errors.get('tcp_resets', [])[:10]),
+            'tcp_retransmissions': dump(errors.get('tcp_retransmissions', [])[:10]),
+            'tcp_retransmissions_extended': dump(errors.get('tcp_retransmissions', [])[:20]),
+            'dns_failures': dump(errors.get('dns_failures', [])[:10]),
+            'dns_failures_extended': dump(errors.get('dns_failures', [])[:30]),
+            'http_errors': dump(errors.get('http_errors', [])[:5]),
+            'conversations': dump(conversations[:CONVERSATION_SAMPLE_LIMIT])
+        }
+    
+    def _trim_samples(self, data: dict):
+        """Drop the tail half of every error and conversation sample list"""
+        errors = data.get('errors', {})
+        conversations = data.get('conversations', [])
+        lists = [v for v in errors.values() if isinstance(v, list)] + [conversations]
+        if all(len(v) <= 1 for v in lists):
+            return None
+        
+        trimmed = dict(data)
+        trimmed['errors'] = {
+            k: v[:len(v) // 2] if isinstance(v, list) else v
+            for k, v in errors.items()
+        }
+        trimmed['conversations'] = conversations[:len(conversations) // 2]
+        return trimmed
+    
+    def create_analysis_prompt(self, data: dict, focus: str = "general") -> str:
+        """Create a focused analysis prompt that fits within MAX_PROMPT_TOKENS"""
+        prompt = self._render_prompt(self._prompt_fields(data), focus)
+        
+        # Shrink the samples until the prompt fits the budget
+        trimmed = data
+        while self.estimate_tokens(prompt) >= MAX_PROMPT_TOKENS:
+            trimmed = self._trim_samples(trimmed)
+            if trimmed is None:
+                print(f"⚠️  Prompt still exceeds {MAX_PROMPT_TOKENS:,} tokens after trimming samples")
+                break
+            prompt = self._render_prompt(self._build_fields(trimmed), focus)
+        
+        if trimmed is not data:
+            print(f"✂️  Trimmed error and conversation samples to fit {MAX_PROMPT_TOKENS:,} tokens")
+        
+        return prompt
+    
+    def _render_prompt(self, fields: dict, focus: str) -> str:
+        """Fill the template for the requested focus"""
+        return _TEMPLATES.get(focus, _GENERAL_TEMPLATE).format_map(fields)
+    
+    def _build_request(self, prompt: str) -> dict:
+        """Build chat completion parameters for an analysis prompt"""
+        kwargs = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are an expert network and Azure/Kubernetes troubleshooting engineer. Analyze network packet captures to identify root causes, patterns, and provide actionable recommendations."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        }
+        kwargs.update(self._token_kwargs)
+        return kwargs
+    
+    def _build_result(self, focus: str, content: str, response_usage) -> dict:
+        """Build an analysis result from model output and its usage statistics"""
+        
+        # Handle reasoning models that might not return visible content
+        if not content or content.strip() == "":
+            # Check if this is a reasoning model with hidden reasoning
+            if (response_usage and 
+                hasattr(response_usage, 'completion_tokens_details') and
+                response_usage.completion_tokens_details and
+                hasattr(response_usage.completion_tokens_details, 'reasoning_tokens') and
+                response_usage.completion_tokens_details.reasoning_tokens > 0):
+                reasoning_tokens = response_usage.completion_tokens_details.reasoning_tokens
+                content = f"""⚠️ **Reasoning Model Output Issue**
 
 The model ({self.model}) used {reasoning_tokens:,} reasoning tokens during processing, but did not return visible analysis content.
 
@@ -376,9 +553,9 @@ The model ({self.model}) used {reasoning_tokens:,} reasoning tokens during proce
 4. Check if the model deployment supports visible output
 
 **Note:** Some reasoning models may process internally without generating visible text. The gpt-5-chat model is recommended for reliable PCAP analysis."""
-                else:
-                    # Model returned empty content without reasoning tokens
-                    content = f"""⚠️ **Empty Model Response**
+            else:
+                # Model returned empty content without reasoning tokens
+                content = f"""⚠️ **Empty Model Response**
 
 The model ({self.model}) returned no content.
 
@@ -390,74 +567,210 @@ The model ({self.model}) returned no content.
 
 **Debug Info:**
 - Model: {self.model}
-- Prompt tokens: {response.usage.prompt_tokens if response.usage else 'N/A'}
-- Completion tokens: {response.usage.completion_tokens if response.usage else 'N/A'}"""
-            
-            # Get usage stats
-            usage = {
-                'prompt_tokens': response.usage.prompt_tokens if response.usage else 0,
-                'completion_tokens': response.usage.completion_tokens if response.usage else 0,
-                'total_tokens': response.usage.total_tokens if response.usage else 0,
-                'reasoning_tokens': 0
-            }
-            
-            if (response.usage and 
-                hasattr(response.usage, 'completion_tokens_details') and
-                response.usage.completion_tokens_details and
-                hasattr(response.usage.completion_tokens_details, 'reasoning_tokens')):
-                usage['reasoning_tokens'] = response.usage.completion_tokens_details.reasoning_tokens
+- Prompt tokens: {response_usage.prompt_tokens if response_usage else 'N/A'}
+- Completion tokens: {response_usage.completion_tokens if response_usage else 'N/A'}"""
+        
+        # Get usage stats
+        usage = {
+            'prompt_tokens': response_usage.prompt_tokens if response_usage else 0,
+            'completion_tokens': response_usage.completion_tokens if response_usage else 0,
+            'total_tokens': response_usage.total_tokens if response_usage else 0,
+            'reasoning_tokens': 0
+        }
+        
+        if (response_usage and 
+            hasattr(response_usage, 'completion_tokens_details') and
+            response_usage.completion_tokens_details and
+            hasattr(response_usage.completion_tokens_details, 'reasoning_tokens')):
+            usage['reasoning_tokens'] = response_usage.completion_tokens_details.reasoning_tokens
+        
+        actual_cost = (usage['prompt_tokens'] / 1_000_000) * 0.150 + (usage['completion_tokens'] / 1_000_000) * 0.600
+        
+        return {
+            'focus': focus,
+            'analysis': content,
+            'usage': usage,
+            'cost': actual_cost,
+            'timestamp': datetime.now().isoformat(),
+            'model': self.model
+        }
+    
+    def _cache_path(self, kwargs: dict) -> Path:
+        """Content-addressed cache location for a chat completion request"""
+        key = hashlib.sha256(orjson.dumps(kwargs, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        return self.cache_dir / f"{key}.json"
+    
+    def _load_cached(self, focus: str, kwargs: dict):
+        """Return a cached result for an identical earlier request, or None"""
+        if not self.use_cache:
+            return None
+        
+        cache_file = self._cache_path(kwargs)
+        try:
+            cached = orjson.loads(cache_file.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        
+        # Entries of another shape (hand-edited, older or newer schema) count as a miss
+        if not isinstance(cached, dict) or not isinstance(cached.get('analysis'), str):
+            return None
+        usage = cached.get('usage')
+        if not isinstance(usage, dict) or not all(
+                key in usage for key in ('prompt_tokens', 'completion_tokens', 'total_tokens', 'reasoning_tokens')):
+            return None
+        
+        print(f"♻️  Using cached {focus} response (no API call): {cache_file}")
+        return {
+            'focus': focus,
+            'analysis': cached['analysis'],
+            'usage': cached['usage'],
+            'cost': 0.0,
+            'timestamp': datetime.now().isoformat(),
+            'model': self.model,
+            'cached': True
+        }
+    
+    def _store_cached(self, kwargs: dict, result: dict):
+        """Cache a model response; failures only cost a future cache miss"""
+        if not self.use_cache:
+            return
+        
+        cache_file = self._cache_path(kwargs)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(exist_ok=True)
+            with open(tmp_file, 'wb') as f:
+                f.write(orjson.dumps({'analysis': result['analysis'], 'usage': result['usage']}))
+            # Atomic rename so concurrent or interrupted runs never see partial entries
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            print(f"⚠️  Warning: Could not write response cache: {e}")
+    
+    def _print_results_header(self, focus: str):
+        """Display the banner shown above analysis output"""
+        print(f"{'='*80}")
+        print(f"ANALYSIS RESULTS - {focus.upper()} FOCUS")
+        print(f"{'='*80}\n")
+    
+    def _report_result(self, result: dict, streamed: bool = False):
+        """Display analysis content and usage statistics
+        
+        When the analysis was already streamed to stdout only the usage
+        statistics are printed.
+        """
+        usage = result['usage']
+        if not streamed:
+            self._print_results_header(result['focus'])
+            print(result['analysis'])
+        print(f"\n{'='*80}")
+        print(f"USAGE STATISTICS")
+        print(f"{'='*80}")
+        print(f"Prompt tokens: {usage['prompt_tokens']:,}")
+        print(f"Completion tokens: {usage['completion_tokens']:,}")
+        if usage['reasoning_tokens'] > 0:
+            print(f"Reasoning tokens: {usage['reasoning_tokens']:,}")
+        print(f"Total tokens: {usage['total_tokens']:,}")
+        print(f"Actual cost: ${result['cost']:.4f}")
+        print(f"{'='*80}\n")
+    
+    def _save_result(self, result: dict):
+        """Save analysis result as Markdown and JSON files"""
+        focus = result['focus']
+        usage = result['usage']
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = self.analysis_dir / f"ai_analysis_{focus}_{timestamp}.md"
+        
+        # Assemble each file in memory and hand it to a large buffer in one write
+        report = (
+            f"# AI-Powered PCAP Analysis - {focus.upper()} Focus\n\n"
+            f"**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"**Model**: {self.model}\n"
+            f"**Tokens Used**: {usage['total_tokens']:,}\n"
+            f"**Cost**: ${result['cost']:.4f}\n\n"
+            "---\n\n"
+            f"{result['analysis']}"
+            "\n\n---\n\n"
+            "## Usage Statistics\n\n"
+            f"```json\n{orjson.dumps(usage, option=orjson.OPT_INDENT_2).decode()}\n```\n"
+        )
+        with open(output_file, 'w', buffering=OUTPUT_BUFFER_SIZE) as f:
+            f.write(report)
+        
+        print(f"💾 Analysis saved to: {output_file}")
+        
+        # Also save JSON
+        json_file = self.analysis_dir / f"ai_analysis_{focus}_{timestamp}.json"
+        with open(json_file, 'wb', buffering=OUTPUT_BUFFER_SIZE) as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+        print(f"💾 JSON saved to: {json_file}\n")
+    
+    def analyze(self, focus: str = "general", save_output: bool = True) -> dict:
+        """Run AI analysis on the PCAP data"""
+        
+        print(f"\n{'='*80}")
+        print(f"AI-POWERED PCAP ANALYSIS - {focus.upper()} FOCUS")
+        print(f"{'='*80}\n")
+        
+        data = self._load_once()
+        if not data:
+            return {}
+        
+        # Create prompt
+        print(f"🔍 Creating {focus} analysis prompt...")
+        prompt = self.create_analysis_prompt(data, focus)
+        
+        # Estimate tokens
+        estimated_tokens = self.estimate_tokens(prompt)
+        estimated_cost = (estimated_tokens / 1_000_000) * 0.150 + (2000 / 1_000_000) * 0.600
+        
+        print(f"📊 Token estimate: ~{estimated_tokens:,}")
+        print(f"💰 Estimated cost: ${estimated_cost:.4f}")
+        
+        request = self._build_request(prompt)
+        result = self._load_cached(focus, request)
+        if result:
+            self._report_result(result)
+            if save_output:
+                self._save_result(result)
+            return result
+        
+        print(f"🤖 Calling Azure OpenAI ({self.model})...")
+        print("   This may take 30-60 seconds for reasoning models...\n")
+        
+        try:
+            # Call Azure OpenAI and stream tokens to stdout as they arrive;
+            # usage statistics are delivered in a final chunk with no choices
+            stream = self.client.chat.completions.create(
+                **request,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
             
-            actual_cost = (usage['prompt_tokens'] / 1_000_000) * 0.150 + (usage['completion_tokens'] / 1_000_000) * 0.600
+            self._print_results_header(focus)
+            content_parts = []
+            response_usage = None
+            for chunk in stream:
+                if chunk.usage:
+                    response_usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    delta = chunk.choices[0].delta.content
+                    sys.stdout.write(delta)
+                    sys.stdout.flush()
+                    content_parts.append(delta)
+            print()
             
-            result = {
-                'focus': focus,
-                'analysis': content,
-                'usage': usage,
-                'cost': actual_cost,
-                'timestamp': datetime.now().isoformat(),
-                'model': self.model
-            }
+            result = self._build_result(focus, "".join(content_parts), response_usage)
             
-            # Display results
-            print(f"{'='*80}")
-            print(f"ANALYSIS RESULTS")
-            print(f"{'='*80}\n")
-            print(content)
-            print(f"\n{'='*80}")
-            print(f"USAGE STATISTICS")
-            print(f"{'='*80}")
-            print(f"Prompt tokens: {usage['prompt_tokens']:,}")
-            print(f"Completion tokens: {usage['completion_tokens']:,}")
-            if usage['reasoning_tokens'] > 0:
-                print(f"Reasoning tokens: {usage['reasoning_tokens']:,}")
-            print(f"Total tokens: {usage['total_tokens']:,}")
-            print(f"Actual cost: ${actual_cost:.4f}")
-            print(f"{'='*80}\n")
+            # Display results (fallback guidance is shown if nothing was streamed)
+            if content_parts:
+                self._store_cached(request, result)
+            else:
+                print(result['analysis'])
+            self._report_result(result, streamed=True)
             
             # Save output
             if save_output:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_file = self.analysis_dir / f"ai_analysis_{focus}_{timestamp}.md"
-                
-                with open(output_file, 'w') as f:
-                    f.write(f"# AI-Powered PCAP Analysis - {focus.upper()} Focus\n\n")
-                    f.write(f"**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write(f"**Model**: {self.model}\n")
-                    f.write(f"**Tokens Used**: {usage['total_tokens']:,}\n")
-                    f.write(f"**Cost**: ${actual_cost:.4f}\n\n")
-                    f.write("---\n\n")
-                    f.write(content)
-                    f.write("\n\n---\n\n")
-                    f.write("## Usage Statistics\n\n")
-                    f.write(f"```json\n{json.dumps(usage, indent=2)}\n```\n")
-                
-                print(f"💾 Analysis saved to: {output_file}")
-                
-                # Also save JSON
-                json_file = self.analysis_dir / f"ai_analysis_{focus}_{timestamp}.json"
-                with open(json_file, 'w') as f:
-                    json.dump(result, f, indent=2)
-                print(f"💾 JSON saved to: {json_file}\n")
+                self._save_result(result)
             
             return result
             
@@ -467,16 +780,199 @@ The model ({self.model}) returned no content.
             traceback.print_exc()
             return {}
     
+    async def analyze_many(self, focuses: list, save_output: bool = True) -> list:
+        """Run several focus analyses concurrently
+        
+        All prompts are built up front from a single load of the analysis files,
+        then every request is in flight at once, so total wall time is roughly
+        that of the slowest focus instead of the sum of all of them. Failed
+        focuses are reported and skipped; the rest are still returned.
+        """
+        
+        print(f"\n{'='*80}")
+        print(f"AI-POWERED PCAP ANALYSIS - {', '.join(f.upper() for f in focuses)} FOCUS")
+        print(f"{'='*80}\n")
+        
+        data = self._load_once()
+        if not data:
+            return []
+        
+        # Create prompts
+        requests = []
+        estimated_tokens = 0
+        for focus in focuses:
+            print(f"🔍 Creating {focus} analysis prompt...")
+            prompt = self.create_analysis_prompt(data, focus)
+            estimated_tokens += self.estimate_tokens(prompt)
+            requests.append(self._build_request(prompt))
+        
+        estimated_cost = (estimated_tokens / 1_000_000) * 0.150 + (2000 * len(focuses) / 1_000_000) * 0.600
+        
+        print(f"📊 Token estimate: ~{estimated_tokens:,}")
+        print(f"💰 Estimated cost: ${estimated_cost:.4f}")
+        
+        cached = {focus: self._load_cached(focus, kwargs) for focus, kwargs in zip(focuses, requests)}
+        pending = [(focus, kwargs) for focus, kwargs in zip(focuses, requests) if not cached[focus]]
+        
+        if pending:
+            print(f"🤖 Calling Azure OpenAI ({self.model}) for {len(pending)} focuses concurrently...")
+            print("   This may take 30-60 seconds for reasoning models...\n")
+        
+        # The client retries rate limits (429) and server errors (5xx) with
+        # exponential backoff before an exception surfaces here
+        responses = await asyncio.gather(
+            *[self.aclient.chat.completions.create(**kwargs) for _, kwargs in pending],
+            return_exceptions=True
+        )
+        responses = dict(zip((focus for focus, _ in pending), responses))
+        
+        results = []
+        for focus, kwargs in zip(focuses, requests):
+            response = responses.get(focus)
+            if isinstance(response, Exception):
+                print(f"❌ Error during {focus} analysis: {response}")
+                continue
+            
+            try:
+                if cached[focus]:
+                    result = cached[focus]
+                else:
+                    content = response.choices[0].message.content
+                    result = self._build_result(focus, content, response.usage)
+                    if content:
+                        self._store_cached(kwargs, result)
+                self._report_result(result)
+                if save_output:
+                    self._save_result(result)
+                results.append(result)
+            except Exception as e:
+                print(f"❌ Error during {focus} analysis: {e}")
+                import traceback
+                traceback.print_exc()
+        
+        return results
+    
+    def submit_batch(self, focuses: list, save_output: bool = True) -> list:
+        """Run focus analyses through the Azure OpenAI Batch API
+        
+        Batch jobs are billed at roughly half the standard rate and have
+        separate, higher rate limits, at the cost of latency: results can take
+        up to the 24h completion window. Requires a Global Batch deployment.
+        """
+        
+        print(f"\n{'='*80}")
+        print(f"AI-POWERED PCAP ANALYSIS (BATCH) - {', '.join(f.upper() for f in focuses)} FOCUS")
+        print(f"{'='*80}\n")
+        
+        data = self._load_once()
+        if not data:
+            return []
+        
+        # Serialize one request per focus
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        batch_file = self.analysis_dir / f"batch_input_{timestamp}.jsonl"
+        with open(batch_file, 'wb') as f:
+            for focus in focuses:
+                print(f"🔍 Creating {focus} analysis prompt...")
+                prompt = self.create_analysis_prompt(data, focus)
+                f.write(orjson.dumps({
+                    "custom_id": focus,
+                    "method": "POST",
+                    "url": "/chat/completions",
+                    "body": self._build_request(prompt)
+                }) + b"\n")
+        
+        # Upload input and create the batch job
+        print(f"📤 Uploading batch input: {batch_file}")
+        with open(batch_file, 'rb') as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/chat/completions",
+            completion_window="24h"
+        )
+        print(f"🤖 Submitted batch job {batch.id} ({self.model})")
+        print(f"   Polling every {BATCH_POLL_INTERVAL}s; results may take up to 24 hours...\n")
+        
+        # Wait for the job to reach a terminal state
+        while batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+            time.sleep(BATCH_POLL_INTERVAL)
+            batch = self.client.batches.retrieve(batch.id)
+            print(f"   Batch status: {batch.status}")
+        
+        if batch.status != 'completed':
+            print(f"❌ Batch job {batch.id} ended with status: {batch.status}")
+            return []
+        
+        # Download results; successful requests land in the output file, failed ones in the error file
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                lines.extend(self.client.files.content(file_id).text.splitlines())
+        
+        results = []
+        answered = set()
+        for line in lines:
+            if not line.strip():
+                continue
+            
+            entry = orjson.loads(line)
+            focus = entry.get('custom_id', 'unknown')
+            answered.add(focus)
+            response = entry.get('response') or {}
+            if entry.get('error') or response.get('status_code') != 200:
+                print(f"❌ Error during {focus} analysis: {entry.get('error') or response.get('body')}")
+                continue
+            
+            completion = ChatCompletion.model_validate(response['body'])
+            result = self._build_result(focus, completion.choices[0].message.content, completion.usage)
+            # Batch requests are billed at 50% of the standard rate
+            result['cost'] *= 0.5
+            self._report_result(result)
+            if save_output:
+                self._save_result(result)
+            results.append(result)
+        
+        for focus in focuses:
+            if focus not in answered:
+                print(f"❌ Batch job {batch.id} returned no result for {focus} analysis")
+        
+        return results
+    
+    def run_all(self, focuses: list, save_output: bool = True, batch: bool = False) -> list:
+        """Analyze every requested focus, sharing one parse of the analysis files
+        
+        A single focus is streamed interactively, several focuses run
+        concurrently, and batch mode submits them all as one Batch API job.
+        """
+        # Drop duplicate focuses while keeping the requested order
+        focuses = list(dict.fromkeys(focuses))
+        
+        if batch:
+            return self.submit_batch(focuses, save_output=save_output)
+        
+        if len(focuses) > 1:
+            return asyncio.run(self.analyze_many(focuses, save_output=save_output))
+        
+        result = self.analyze(focus=focuses[0], save_output=save_output)
+        return [result] if result else []
+    
     def compare_analyses(self, analysis_files: list):
         """Compare multiple AI analyses to find trends"""
         print(f"\n{'='*80}")
         print(f"COMPARING {len(analysis_files)} ANALYSES")
         print(f"{'='*80}\n")
         
+        # Keep only an excerpt of each analysis so the prompt and memory stay bounded
         analyses = []
         for file in analysis_files:
-            with open(file, 'r') as f:
-                analyses.append(json.load(f))
+            analysis = orjson.loads(Path(file).read_bytes())
+            analyses.append({
+                'focus': analysis.get('focus'),
+                'timestamp': analysis.get('timestamp'),
+                'excerpt': analysis.get('analysis', '')[:COMPARISON_EXCERPT_CHARS]
+            })
         
         # Create comparison prompt
         prompt = f"""Compare these {len(analyses)} network analyses and identify:
@@ -487,7 +983,7 @@ The model ({self.model}) returned no content.
 4. **Success Metrics**: How will we know if fixes are working?
 
 Analyses:
-{json.dumps(analyses, indent=2)}"""
+{orjson.dumps(analyses).decode()}"""
         
         print("🤖 Generating comparison analysis...")
         
@@ -553,9 +1049,18 @@ Examples:
   # Focus on DNS issues
   python analyze_with_ai.py --focus dns
   
+  # Run several focus areas concurrently
+  python analyze_with_ai.py --focus errors performance dns
+  
+  # Submit focus areas as a discounted Batch API job (non-interactive)
+  python analyze_with_ai.py --focus errors performance dns --batch
+  
   # Custom analysis directory
   python analyze_with_ai.py --dir /path/to/ai_analysis
   
+  # Ride out rate limiting on a busy deployment
+  python analyze_with_ai.py --focus errors performance dns --max-retries 5
+  
   # Compare multiple analyses
   python analyze_with_ai.py --compare ai_analysis/ai_analysis_*.json
         """
@@ -569,9 +1074,10 @@ Examples:
     
     parser.add_argument(
         '--focus',
+        nargs='+',
         choices=['general', 'errors', 'performance', 'dns'],
-        default='general',
-        help='Analysis focus area (default: general)'
+        default=['general'],
+        help='Analysis focus area(s); multiple focuses run concurrently (default: general)'
     )
     
     parser.add_argument(
@@ -580,6 +1086,25 @@ Examples:
         help='Do not save analysis output to files'
     )
     
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always call the model, ignoring cached responses in <dir>/.cache/'
+    )
+    
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Submit analyses via the Azure OpenAI Batch API (~50%% cheaper, results within 24h)'
+    )
+    
+    parser.add_argument(
+        '--max-retries',
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=f'Retries for rate-limited or failed API calls, with exponential backoff (default: {DEFAULT_MAX_RETRIES})'
+    )
+    
     parser.add_argument(
         '--compare',
         nargs='+',
@@ -609,11 +1134,16 @@ Examples:
             print("AI-POWERED PCAP ANALYSIS")
             print("="*60)
             print(f"Analysis Directory: {args.dir}")
-            print(f"Focus: {args.focus}")
+            print(f"Focus: {', '.join(args.focus)}")
             print(f"Model: {args.model or 'gpt-5-chat (default)'}")
             print()
             
-            analyzer = PCAPAIAnalyzer(args.dir, model_override=args.model)
+            analyzer = PCAPAIAnalyzer(
+                args.dir,
+                model_override=args.model,
+                use_cache=not args.no_cache,
+                max_retries=args.max_retries
+            )
             
         except FileNotFoundError as e:
             print(f"\n❌ Error: {e}", file=sys.stderr)
@@ -651,9 +1181,10 @@ Examples:
                 
                 analyzer.compare_analyses(args.compare)
             else:
-                analyzer.analyze(
-                    focus=args.focus,
-                    save_output=not args.no_save
+                analyzer.run_all(
+                    args.focus,
+                    save_output=not args.no_save,
+                    batch=args.batch
                 )
             
             print("\n✅ Analysis complete!")
@@ -679,7 +1210,7 @@ Examples:
                 sys.exit(1)
             elif "rate limit" in error_msg or "429" in error_msg:
                 print(f"\n❌ Error: Rate limit exceeded: {e}", file=sys.stderr)
-                print("  Wait a moment and try again", file=sys.stderr)
+                print("  Wait a moment and try again, or raise --max-retries", file=sys.stderr)
                 sys.exit(1)
             elif "quota" in error_msg:
                 print(f"\n❌ Error: Quota exceeded: {e}", file=sys.stderr)
@@ -19,25 +19,352 @@ disclaimer in analyze_with_ai.py before proceeding to AI analysis.
 """
 
 import os
+import re
 import sys
-import json
+import socket
+import heapq
+import struct
+import time
+from array import array
 from datetime import datetime
+from operator import itemgetter
 from collections import defaultdict, Counter
-from scapy.all import rdpcap, IP, IPv6, TCP, UDP, DNS, DNSQR, DNSRR, Raw, ICMP
+from concurrent.futures import ProcessPoolExecutor
+import orjson
+from scapy.all import RawPcapReader, RawPcapNgReader, conf, IP, IPv6, TCP, UDP, DNS, DNSQR, DNSRR, Raw, ICMP
+from scapy.layers.dns import DNSRR_DISPATCHER, EDNS0OPT_DISPATCHER
 import hashlib
 
+# Link-layer header types handled by the raw decoder
+DLT_EN10MB = 1
+DLT_RAW_ALT = 12
+DLT_RAW = 101
+DLT_LINUX_SLL = 113
+DLT_IPV4 = 228
+DLT_IPV6 = 229
+
+ETH_P_IP = 0x0800
+ETH_P_IPV6 = 0x86DD
+ETH_P_8021Q = 0x8100
+
+TCP_FIN = 0x01
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_PSH = 0x08
+TCP_ACK = 0x10
+TCP_FLAG_LETTERS = 'FSRPAUECN'  # scapy's TCP flag order, lowest bit first
+
+# tcp_flags_distribution names for each combination of the FIN/SYN/RST/PSH/ACK bits
+TCP_FLAG_NAMES = tuple(
+    '|'.join(name for bit, name in ((TCP_SYN, 'SYN'), (TCP_ACK, 'ACK'), (TCP_FIN, 'FIN'),
+                                    (TCP_RST, 'RST'), (TCP_PSH, 'PSH')) if combo & bit) or 'NONE'
+    for combo in range(32)
+)
+
+# Records kept per list for errors_detailed.json; the rest are only counted
+RECORD_LIMITS = {
+    'tcp_resets': 50,
+    'tcp_retransmissions': 50,
+    'dns_failures': 50,
+    'http_errors': 50,
+    'connection_failures': 30,
+    'large_packets': 20
+}
+
+# Seconds between "Processed N packets" progress lines
+PROGRESS_INTERVAL = 1.0
+
+# Hot Counters tallied into lists per packet and folded in with Counter.update()
+# every 4096 packets, which counts in C and keeps first-seen key order
+TALLIED_COUNTERS = ('protocols', 'src_ips', 'dst_ips', 'src_ports', 'dst_ports')
+
+# Columns of the first-seen TCP segment table kept by --jobs workers:
+# seq hash, packet number, timestamp, flow key high 32 / low 64 bits, seq, length
+_SEGMENT_TYPECODES = ('q', 'Q', 'd', 'I', 'Q', 'I', 'I')
+_LOW64 = (1 << 64) - 1
+
+# DNS response codes by value
+_RCODE_NAMES = ('NOERROR', 'FORMERR', 'SERVFAIL', 'NXDOMAIN', 'NOTIMP', 'REFUSED')
+
+# Precompiled header decoders for the raw packet path
+_unpack_ipv4 = struct.Struct('!H2xHxB').unpack_from   # total length, frag, proto
+_unpack_ipv6 = struct.Struct('!HB').unpack_from       # payload length, next header
+_unpack_tcp = struct.Struct('!HHIIH').unpack_from     # ports, seq, ack, offset/flags
+_unpack_udp = struct.Struct('!HHH').unpack_from       # ports, length
+_unpack_addrs = struct.Struct('!II').unpack_from      # IPv4 source, destination
+_pack_u32 = struct.Struct('!I').pack
+_unpack_u32 = struct.Struct('!I').unpack
+_inet_ntoa = socket.inet_ntoa
+
+# HTTP error status lines, matched on the raw payload bytes
+_HTTP_ERROR_CODES = ('400', '401', '403', '404', '500', '502', '503', '504')
+_find_http_errors = re.compile(rb'HTTP/1\.[01] (40[0134]|50[0234])').findall
+
+def _to_json(obj):
+    """Serialize obj as 2-space indented JSON bytes"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+def _ip_to_int(addr):
+    """Convert a dotted-quad IPv4 address to its 32-bit integer"""
+    return _unpack_u32(socket.inet_aton(addr))[0]
+
+def _int_to_ip(value):
+    """Convert a 32-bit integer back to a dotted-quad IPv4 address"""
+    return _inet_ntoa(_pack_u32(value))
+
+def _flow_key(src, dst, sport, dport):
+    """Pack an IPv4 4-tuple into one int: src(32) | dst(32) | sport(16) | dport(16)"""
+    return (src << 64) | (dst << 32) | (sport << 16) | dport
+
+def _flow_endpoints(key):
+    """Render a packed flow key as ('src:sport', 'dst:dport')"""
+    return (f"{_int_to_ip(key >> 64)}:{key >> 16 & 0xFFFF}",
+            f"{_int_to_ip(key >> 32 & 0xFFFFFFFF)}:{key & 0xFFFF}")
+
+def _bound_ports(layer):
+    """Ports on which scapy dissects the layer's payload as a protocol rather than Raw"""
+    ports = set()
+    for fields, _cls in layer.payload_guess:
+        ports.update(v for k, v in fields.items() if k in ('sport', 'dport'))
+    return frozenset(ports)
+
+# Packets on these ports (DNS, Kerberos, SMB, VXLAN, ...) are left to scapy
+_SCAPY_TCP_PORTS = _bound_ports(TCP)
+_SCAPY_UDP_PORTS = _bound_ports(UDP)
+
+# ...except UDP ports bound to nothing but DNS, which decode_dns() parses itself
+_DNS_UDP_PORTS = _SCAPY_UDP_PORTS - frozenset(
+    v for fields, cls in UDP.payload_guess if cls is not DNS for v in fields.values())
+_OTHER_UDP_PORTS = _SCAPY_UDP_PORTS - _DNS_UDP_PORTS
+
+# RR types and EDNS options scapy dissects into structured classes (left to scapy);
+# OPT records, padding and well-formed cookies frame like plain TLVs
+_DNS_SPECIAL_TYPES = frozenset(DNSRR_DISPATCHER) - {41}
+_EDNS_SPECIAL_OPTIONS = frozenset(EDNS0OPT_DISPATCHER) - {10, 12}
+EDNS_COOKIE = 10
+_unpack_dns_header = struct.Struct('!2xBBHHHH').unpack_from
+_unpack_rr = struct.Struct('!H6xH').unpack_from
+_unpack_option = struct.Struct('!HH').unpack_from
+
+def decode_l3l4(buf, linktype):
+    """Decode the IP and transport headers of a plain IPv4/IPv6 packet
+    
+    Covers IPv4 TCP/UDP/ICMP echo and IPv6 TCP/UDP over Ethernet, 802.1Q, Linux
+    cooked and raw-IP links, returning a fixed record:
+    (ip_version, src, dst, proto, sport, dport, flags, seq, ack, payload).
+    IPv4 addresses are 32-bit ints; IPv6 addresses are not decoded (None). Returns None for anything scapy must
+    dissect: fragments, tunnels, ICMP errors, malformed headers and payloads
+    scapy parses as a protocol such as SMB. UDP DNS payloads are returned for
+    decode_dns().
+    """
+    n = len(buf)
+    
+    # Link layer
+    if linktype == DLT_EN10MB:
+        if n < 14:
+            return None
+        ethertype = (buf[12] << 8) | buf[13]
+        off = 14
+        if ethertype == ETH_P_8021Q:
+            if n < 18:
+                return None
+            ethertype = (buf[16] << 8) | buf[17]
+            off = 18
+    elif linktype == DLT_LINUX_SLL:
+        if n < 16:
+            return None
+        ethertype = (buf[14] << 8) | buf[15]
+        off = 16
+    elif linktype in (DLT_RAW, DLT_RAW_ALT):
+        if n == 0:
+            return None
+        version = buf[0] >> 4
+        ethertype = ETH_P_IP if version == 4 else ETH_P_IPV6 if version == 6 else None
+        off = 0
+    elif linktype == DLT_IPV4:
+        ethertype, off = ETH_P_IP, 0
+    elif linktype == DLT_IPV6:
+        ethertype, off = ETH_P_IPV6, 0
+    else:
+        return None
+    
+    # Network layer
+    if ethertype == ETH_P_IP:
+        if n < off + 20:
+            return None
+        ihl = (buf[off] & 0x0F) * 4
+        if buf[off] >> 4 != 4 or ihl < 20 or n < off + ihl:
+            return None
+        total_len, frag, proto = _unpack_ipv4(buf, off + 2)
+        if total_len < ihl or frag & 0x3FFF:  # fragments keep scapy's handling
+            return None
+        end = min(off + total_len, n)
+        l4 = off + ihl
+    elif ethertype == ETH_P_IPV6:
+        if n < off + 40 or buf[off] >> 4 != 6:
+            return None
+        payload_len, proto = _unpack_ipv6(buf, off + 4)
+        end = min(off + 40 + payload_len, n)
+        l4 = off + 40
+    else:
+        return None
+    
+    # Transport layer
+    if proto == 6:
+        if end - l4 < 20:
+            return None
+        sport, dport, seq, ack, offset_flags = _unpack_tcp(buf, l4)
+        data_off = (offset_flags >> 12) * 4
+        if data_off < 20 or l4 + data_off > end:
+            return None
+        if sport in _SCAPY_TCP_PORTS or dport in _SCAPY_TCP_PORTS:
+            return None
+        flags = offset_flags & 0x1FF
+        payload = buf[l4 + data_off:end]
+    elif proto == 17:
+        if end - l4 < 8:
+            return None
+        sport, dport, udp_len = _unpack_udp(buf, l4)
+        if udp_len < 8 or sport in _OTHER_UDP_PORTS or dport in _OTHER_UDP_PORTS:
+            return None
+        flags = seq = ack = 0
+        payload = buf[l4 + 8:min(l4 + udp_len, end)]
+    elif proto == 1 and ethertype == ETH_P_IP:
+        if end - l4 < 8 or buf[l4] not in (0, 8):  # echo only; errors embed packets
+            return None
+        sport = dport = flags = seq = ack = 0
+        payload = buf[l4 + 8:end]
+    else:
+        return None
+    
+    if ethertype == ETH_P_IPV6:
+        return 6, None, None, proto, sport, dport, flags, seq, ack, payload
+    src, dst = _unpack_addrs(buf, off + 12)
+    return 4, src, dst, proto, sport, dport, flags, seq, ack, payload
+
+def _skip_name(msg, pos, end, compressed):
+    """Offset just past the DNS name at pos, or None if it runs out of bounds
+    
+    A trailing compression pointer ends the name; compressed=False rejects it.
+    """
+    while pos < end:
+        length = msg[pos]
+        if length == 0:
+            return pos + 1
+        if length & 0xC0:
+            if not compressed or length & 0xC0 != 0xC0 or pos + 2 > end:
+                return None
+            return pos + 2
+        pos += length + 1
+    return None
+
+def decode_dns(msg):
+    """Decode a UDP DNS message as (qr, rcode, first qname or None)
+    
+    Every question and resource record is framed so the result matches scapy's
+    dissection exactly; None (dissect with scapy) for compressed questions,
+    RR types and EDNS options scapy parses into their own classes, short A/AAAA
+    data, truncated records and trailing bytes.
+    """
+    end = len(msg)
+    if end < 12:
+        return None
+    flags_hi, flags_lo, qdcount, ancount, nscount, arcount = _unpack_dns_header(msg)
+    
+    pos = 12
+    qname = None
+    for _ in range(qdcount):
+        start = pos
+        pos = _skip_name(msg, pos, end, False)
+        if pos is None or pos + 4 > end:
+            return None
+        if qname is None:
+            qname = _dns_labels(msg, start)
+        pos += 4
+    
+    for _ in range(ancount + nscount + arcount):
+        pos = _skip_name(msg, pos, end, True)
+        if pos is None or pos + 10 > end:
+            return None
+        rtype, rdlen = _unpack_rr(msg, pos)
+        pos += 10
+        rend = pos + rdlen
+        if rend > end or rtype in _DNS_SPECIAL_TYPES:
+            return None
+        if rtype == 1 and rdlen != 4 or rtype == 28 and rdlen != 16:
+            return None
+        if rtype == 41:  # EDNS OPT: options must frame rdata exactly
+            while pos < rend:
+                if pos + 4 > rend:
+                    return None
+                code, optlen = _unpack_option(msg, pos)
+                pos += 4 + optlen
+                if code in _EDNS_SPECIAL_OPTIONS or pos > rend or code == EDNS_COOKIE and optlen < 8:
+                    return None
+        pos = rend
+    
+    if pos != end:
+        return None
+    return flags_hi >> 7, flags_lo & 0x0F, qname
+
+def _dns_labels(msg, pos):
+    """Uncompressed DNS name at pos as scapy renders it (b'www.example.com.', b'.' for root)"""
+    labels = []
+    while length := msg[pos]:
+        labels.append(msg[pos + 1:pos + 1 + length])
+        pos += length + 1
+    return b'.'.join(labels) + b'.' if labels else b'.'
+
+def _retransmission(pkt_num, timestamp, flow, seq, pkt_len):
+    """Build a tcp_retransmissions record"""
+    src, dst = _flow_endpoints(flow)
+    return {
+        'packet_num': pkt_num,
+        'timestamp': timestamp,
+        'src': src,
+        'dst': dst,
+        'seq': seq,
+        'length': pkt_len
+    }
+
+def _new_conversation():
+    """Empty conversation record (a module function so stats stay picklable)"""
+    return {
+        'packets': 0,
+        'bytes': 0,
+        'first_seen': None,
+        'last_seen': None,
+        'flags': Counter()  # TCP flags int -> packets, in first-seen order
+    }
+
+def _analyze_shard(pcap_file, start, stop, first_shard):
+    """--jobs worker: analyze packets start..stop-1 and return what the merge needs
+    
+    Returns (stats, seen TCP segments, first segments). Later shards also list the
+    segments they saw first, since an earlier shard may already have seen them.
+    """
+    prep = PCAPAnalysisPrep(pcap_file, quiet=True)
+    if not first_shard:
+        prep._first_segments = tuple(array(code) for code in _SEGMENT_TYPECODES)
+    prep.load_packets()
+    prep.analyze_all(packet_range=(start, stop))
+    return prep.stats, prep.tcp_seq_track, prep._first_segments
+
 class PCAPAnalysisPrep:
-    def __init__(self, pcap_file):
+    def __init__(self, pcap_file, quiet=False):
         self.pcap_file = pcap_file
-        self.packets = []
+        self._quiet = quiet
+        self._reader = None
+        self._first_segments = None  # set in --jobs workers after the first shard
         self.stats = {
             'total_packets': 0,
             'protocols': Counter(),
-            'src_ips': Counter(),
+            'src_ips': Counter(),       # keyed by 32-bit int address
             'dst_ips': Counter(),
             'src_ports': Counter(),
             'dst_ports': Counter(),
-            'tcp_flags': Counter(),
+            'tcp_flags': [0] * 32,      # histogram indexed by flags & 0x1F
+            'tcp_flags_order': [],      # histogram slots in first-seen order
             'dns_queries': Counter(),
             'dns_failures': [],
             'http_errors': [],
@@ -45,20 +372,23 @@ class PCAPAnalysisPrep:
             'tcp_resets': [],
             'connection_failures': [],
             'large_packets': [],
-            'errors_by_type': defaultdict(list),
-            'conversations': defaultdict(lambda: {
-                'packets': 0,
-                'bytes': 0,
-                'first_seen': None,
-                'last_seen': None,
-                'flags': []
-            })
+            'record_counts': Counter(),  # true totals of the capped record lists
+            'errors_by_type': Counter(),
+            'error_first_packet': {},    # error type -> packet it was first seen in
+            'total_errors': 0,
+            'conversations': defaultdict(_new_conversation)  # keyed by packed _flow_key()
         }
-        self.tcp_seq_track = defaultdict(set)  # Track TCP sequences for retransmission detection
+        self._tallies = {key: [] for key in TALLIED_COUNTERS}
+        (self._tally_protocol, self._tally_src_ip, self._tally_dst_ip,
+         self._tally_src_port, self._tally_dst_port) = (self._tallies[key].append for key in TALLIED_COUNTERS)
+        # Track TCP sequences for retransmission detection: one flat set of 64-bit
+        # hashes of (flow, seq, length) instead of a set of strings per connection
+        self.tcp_seq_track = set()
         
     def load_packets(self):
-        """Load packets from PCAP file with comprehensive error handling"""
-        print(f"Loading PCAP file: {self.pcap_file}")
+        """Open the PCAP file for streaming with comprehensive error handling"""
+        if not self._quiet:
+            print(f"Loading PCAP file: {self.pcap_file}")
         
         try:
             # Validate file before attempting to read
@@ -68,14 +398,12 @@ class PCAPAnalysisPrep:
             if not os.access(self.pcap_file, os.R_OK):
                 raise PermissionError(f"Cannot read PCAP file: {self.pcap_file}")
             
-            # Attempt to read PCAP
-            self.packets = rdpcap(self.pcap_file)
-            self.stats['total_packets'] = len(self.packets)
+            # Open a streaming reader (validates the capture header); packets are
+            # decoded one at a time in analyze_all() instead of held in memory
+            self._reader = RawPcapReader(self.pcap_file)
             
-            if len(self.packets) == 0:
-                raise ValueError("PCAP file contains no packets")
-            
-            print(f"✓ Loaded {len(self.packets):,} packets")
+            if not self._quiet:
+                print(f"✓ Opened capture for streaming")
             
         except FileNotFoundError as e:
             raise FileNotFoundError(f"PCAP file not found: {self.pcap_file}") from e
@@ -98,183 +426,426 @@ class PCAPAnalysisPrep:
                 raise RuntimeError(f"Failed to load PCAP file: {e}") from e
     
     def analyze_packet(self, pkt, pkt_num):
-        """Analyze a single packet for errors and anomalies"""
+        """Analyze a single scapy-dissected packet for errors and anomalies"""
         timestamp = float(pkt.time)
+        pkt_len = len(pkt)
+        tcp_flow = None
+        
+        # Look each layer up once; haslayer()/pkt[...] both walk the layer chain
+        ip = pkt.getlayer(IP)
+        tcp = pkt.getlayer(TCP)
         
         # Protocol identification
-        if pkt.haslayer(IP):
-            ip = pkt[IP]
-            self.stats['protocols']['IPv4'] += 1
-            self.stats['src_ips'][ip.src] += 1
-            self.stats['dst_ips'][ip.dst] += 1
+        if ip is not None:
+            ip_src, ip_dst = ip.src, ip.dst
+            src, dst = _ip_to_int(ip_src), _ip_to_int(ip_dst)
+            self._record_ipv4(src, dst)
             
             # Track conversation
-            if pkt.haslayer(TCP):
-                tcp = pkt[TCP]
-                conv_key = f"{ip.src}:{tcp.sport} -> {ip.dst}:{tcp.dport}"
-                conv = self.stats['conversations'][conv_key]
-                conv['packets'] += 1
-                conv['bytes'] += len(pkt)
-                if conv['first_seen'] is None:
-                    conv['first_seen'] = timestamp
-                conv['last_seen'] = timestamp
-                conv['flags'].append(tcp.flags)
-                
-                self.stats['protocols']['TCP'] += 1
-                self.stats['src_ports'][tcp.sport] += 1
-                self.stats['dst_ports'][tcp.dport] += 1
-                
-                # TCP flags analysis
-                flags = []
-                if tcp.flags.S: flags.append('SYN')
-                if tcp.flags.A: flags.append('ACK')
-                if tcp.flags.F: flags.append('FIN')
-                if tcp.flags.R: flags.append('RST')
-                if tcp.flags.P: flags.append('PSH')
-                
-                flag_str = '|'.join(flags) if flags else 'NONE'
-                self.stats['tcp_flags'][flag_str] += 1
-                
-                # Detect TCP resets (connection issues)
-                if tcp.flags.R:
-                    self.stats['tcp_resets'].append({
-                        'packet_num': pkt_num,
-                        'timestamp': timestamp,
-                        'src': f"{ip.src}:{tcp.sport}",
-                        'dst': f"{ip.dst}:{tcp.dport}",
-                        'seq': tcp.seq,
-                        'ack': tcp.ack
-                    })
-                    self.stats['errors_by_type']['TCP_RESET'].append(pkt_num)
-                
-                # Detect retransmissions
-                conn_key = f"{ip.src}:{tcp.sport}->{ip.dst}:{tcp.dport}"
-                seq_key = f"{tcp.seq}-{len(pkt)}"
-                if seq_key in self.tcp_seq_track[conn_key] and len(pkt) > 60:
-                    self.stats['tcp_retransmissions'].append({
-                        'packet_num': pkt_num,
-                        'timestamp': timestamp,
-                        'src': f"{ip.src}:{tcp.sport}",
-                        'dst': f"{ip.dst}:{tcp.dport}",
-                        'seq': tcp.seq,
-                        'length': len(pkt)
-                    })
-                    self.stats['errors_by_type']['TCP_RETRANSMISSION'].append(pkt_num)
-                else:
-                    self.tcp_seq_track[conn_key].add(seq_key)
-                
-                # Detect SYN without SYN-ACK response (connection failures)
-                if tcp.flags.S and not tcp.flags.A:
-                    self.stats['connection_failures'].append({
-                        'packet_num': pkt_num,
-                        'timestamp': timestamp,
-                        'src': f"{ip.src}:{tcp.sport}",
-                        'dst': f"{ip.dst}:{tcp.dport}",
-                        'type': 'SYN_NO_RESPONSE'
-                    })
-                
-            elif pkt.haslayer(UDP):
-                udp = pkt[UDP]
-                self.stats['protocols']['UDP'] += 1
-                self.stats['src_ports'][udp.sport] += 1
-                self.stats['dst_ports'][udp.dport] += 1
-                
-                conv_key = f"{ip.src}:{udp.sport} -> {ip.dst}:{udp.dport}"
-                conv = self.stats['conversations'][conv_key]
-                conv['packets'] += 1
-                conv['bytes'] += len(pkt)
-                if conv['first_seen'] is None:
-                    conv['first_seen'] = timestamp
-                conv['last_seen'] = timestamp
+            if tcp is not None:
+                sport, dport = tcp.sport, tcp.dport
+                tcp_flow = _flow_key(src, dst, sport, dport)
+                self._record_tcp(pkt_num, timestamp, pkt_len, tcp_flow,
+                                 sport, dport, int(tcp.flags), tcp.seq, tcp.ack)
             
-            elif pkt.haslayer(ICMP):
-                icmp = pkt[ICMP]
-                self.stats['protocols']['ICMP'] += 1
-                
-                # ICMP errors are important
-                if icmp.type == 3:  # Destination Unreachable
-                    self.stats['errors_by_type']['ICMP_DEST_UNREACHABLE'].append({
-                        'packet_num': pkt_num,
-                        'timestamp': timestamp,
-                        'src': ip.src,
-                        'dst': ip.dst,
-                        'code': icmp.code
-                    })
+            elif (udp := pkt.getlayer(UDP)) is not None:
+                sport, dport = udp.sport, udp.dport
+                self._record_udp(timestamp, pkt_len, _flow_key(src, dst, sport, dport), sport, dport)
+            
+            elif (icmp := pkt.getlayer(ICMP)) is not None:
+                self._record_icmp(pkt_num, icmp.type)
         
-        elif pkt.haslayer(IPv6):
-            self.stats['protocols']['IPv6'] += 1
+        elif pkt.getlayer(IPv6) is not None:
+            self._tally_protocol('IPv6')
         
         # DNS Analysis
-        if pkt.haslayer(DNS):
-            dns = pkt[DNS]
-            if dns.qr == 0:  # Query
-                if dns.qd:
-                    qname = dns.qd.qname.decode('utf-8', errors='ignore').rstrip('.')
-                    self.stats['dns_queries'][qname] += 1
-            else:  # Response
-                if dns.rcode != 0:  # DNS error
-                    qname = dns.qd.qname.decode('utf-8', errors='ignore').rstrip('.') if dns.qd else 'unknown'
+        dns = pkt.getlayer(DNS)
+        if dns is not None:
+            qr, rcode = dns.qr, dns.rcode
+            qname = dns.qd.qname if dns.qd and (qr == 0 or rcode != 0) else None
+            self._record_dns(pkt_num, timestamp, qr, rcode, qname)
+        
+        # HTTP Error Detection
+        raw = pkt.getlayer(Raw)
+        if raw is not None:
+            self._record_http(pkt_num, timestamp, raw.load, tcp_flow)
+        
+        # Large packet detection (fragmentation issues)
+        if pkt_len > 1400:
+            if ip is not None:
+                self._record_large(pkt_num, timestamp, pkt_len, ip_src, ip_dst)
+            else:
+                self._record_large(pkt_num, timestamp, pkt_len, 'unknown', 'unknown')
+    
+    def _analyze_raw(self, buf, linktype, timestamp, pkt_num):
+        """Analyze a packet from its header bytes; False if scapy must dissect it"""
+        record = decode_l3l4(buf, linktype)
+        if record is None:
+            return False
+        
+        version, src, dst, proto, sport, dport, flags, seq, ack, payload = record
+        dns = None
+        if proto == 17 and (sport in _DNS_UDP_PORTS or dport in _DNS_UDP_PORTS):
+            dns = decode_dns(payload)
+            if dns is None:
+                return False
+        
+        n = len(buf)
+        if version == 6:
+            self._tally_protocol('IPv6')
+            if dns is not None:
+                self._record_dns(pkt_num, timestamp, *dns)
+            elif payload:
+                self._record_http(pkt_num, timestamp, payload, None)
+            if n > 1400:
+                self._record_large(pkt_num, timestamp, n, 'unknown', 'unknown')
+            return True
+        
+        self._record_ipv4(src, dst)
+        if proto == 6:
+            flow = (src << 64) | (dst << 32) | (sport << 16) | dport  # _flow_key, inlined
+            self._record_tcp(pkt_num, timestamp, n, flow, sport, dport, flags, seq, ack)
+            if payload:
+                self._record_http(pkt_num, timestamp, payload, flow)
+        elif proto == 17:
+            flow = (src << 64) | (dst << 32) | (sport << 16) | dport
+            self._record_udp(timestamp, n, flow, sport, dport)
+            if dns is not None:
+                self._record_dns(pkt_num, timestamp, *dns)
+            elif payload:
+                self._record_http(pkt_num, timestamp, payload, None)
+        else:
+            self._tally_protocol('ICMP')
+            if payload:
+                self._record_http(pkt_num, timestamp, payload, None)
+        if n > 1400:
+            self._record_large(pkt_num, timestamp, n, _int_to_ip(src), _int_to_ip(dst))
+        return True
+    
+    def _flush_tallies(self):
+        """Fold the per-packet TALLIED_COUNTERS lists into their stats Counters"""
+        for key, values in self._tallies.items():
+            if values:
+                self.stats[key].update(values)
+                values.clear()
+    
+    def _record_ipv4(self, src, dst):
+        """Count an IPv4 packet and its endpoints (32-bit int addresses)"""
+        self._tally_protocol('IPv4')
+        self._tally_src_ip(src)
+        self._tally_dst_ip(dst)
+    
+    def _record_tcp(self, pkt_num, timestamp, pkt_len, flow, sport, dport, flags, seq, ack):
+        """Track a TCP segment's conversation, flags, resets and retransmissions"""
+        conv = self.stats['conversations'][flow]
+        conv['packets'] += 1
+        conv['bytes'] += pkt_len
+        if conv['first_seen'] is None:
+            conv['first_seen'] = timestamp
+        conv['last_seen'] = timestamp
+        conv['flags'][flags] += 1
+        
+        self._tally_protocol('TCP')
+        self._tally_src_port(sport)
+        self._tally_dst_port(dport)
+        
+        # TCP flags analysis; names are only rendered in generate_summary()
+        flag_hist = self.stats['tcp_flags']
+        slot = flags & 0x1F
+        if not flag_hist[slot]:
+            self.stats['tcp_flags_order'].append(slot)
+        flag_hist[slot] += 1
+        
+        # Detect TCP resets (connection issues)
+        if flags & TCP_RST and self._keep_record('tcp_resets'):
+            src, dst = _flow_endpoints(flow)
+            self.stats['tcp_resets'].append({
+                'packet_num': pkt_num,
+                'timestamp': timestamp,
+                'src': src,
+                'dst': dst,
+                'seq': seq,
+                'ack': ack
+            })
+        if flags & TCP_RST:
+            self._count_error('TCP_RESET', pkt_num)
+        
+        # Detect retransmissions
+        seq_key = hash((flow, seq, pkt_len))
+        if seq_key in self.tcp_seq_track and pkt_len > 60:
+            if self._keep_record('tcp_retransmissions'):
+                self.stats['tcp_retransmissions'].append(_retransmission(pkt_num, timestamp, flow, seq, pkt_len))
+            self._count_error('TCP_RETRANSMISSION', pkt_num)
+        else:
+            self.tcp_seq_track.add(seq_key)
+            if self._first_segments is not None and pkt_len > 60:
+                # Typed columns take ~45 bytes per segment against ~250 for a tuple
+                keys, nums, times, flows_hi, flows_lo, seqs, lengths = self._first_segments
+                keys.append(seq_key)
+                nums.append(pkt_num)
+                times.append(timestamp)
+                flows_hi.append(flow >> 64)
+                flows_lo.append(flow & _LOW64)
+                seqs.append(seq)
+                lengths.append(pkt_len)
+        
+        # Detect SYN without SYN-ACK response (connection failures)
+        if flags & TCP_SYN and not flags & TCP_ACK and self._keep_record('connection_failures'):
+            src, dst = _flow_endpoints(flow)
+            self.stats['connection_failures'].append({
+                'packet_num': pkt_num,
+                'timestamp': timestamp,
+                'src': src,
+                'dst': dst,
+                'type': 'SYN_NO_RESPONSE'
+            })
+    
+    def _record_udp(self, timestamp, pkt_len, flow, sport, dport):
+        """Track a UDP datagram's ports and conversation"""
+        self._tally_protocol('UDP')
+        self._tally_src_port(sport)
+        self._tally_dst_port(dport)
+        
+        conv = self.stats['conversations'][flow]
+        conv['packets'] += 1
+        conv['bytes'] += pkt_len
+        if conv['first_seen'] is None:
+            conv['first_seen'] = timestamp
+        conv['last_seen'] = timestamp
+    
+    def _record_icmp(self, pkt_num, icmp_type):
+        """Count an ICMP message and keep destination-unreachable errors"""
+        self._tally_protocol('ICMP')
+        
+        # ICMP errors are important
+        if icmp_type == 3:  # Destination Unreachable
+            self._count_error('ICMP_DEST_UNREACHABLE', pkt_num)
+    
+    def _record_dns(self, pkt_num, timestamp, qr, rcode, qname):
+        """Count DNS queries and keep failed responses (qname is None without a question)"""
+        if qr == 0:  # Query
+            if qname is not None:
+                qname = qname.decode('utf-8', errors='ignore').rstrip('.')
+                self.stats['dns_queries'][qname] += 1
+        else:  # Response
+            if rcode != 0:  # DNS error
+                qname = qname.decode('utf-8', errors='ignore').rstrip('.') if qname is not None else 'unknown'
+                if self._keep_record('dns_failures'):
                     self.stats['dns_failures'].append({
                         'packet_num': pkt_num,
                         'timestamp': timestamp,
                         'query': qname,
-                        'rcode': dns.rcode,
-                        'rcode_name': self._dns_rcode_name(dns.rcode)
+                        'rcode': rcode,
+                        'rcode_name': _RCODE_NAMES[rcode] if rcode < 6 else f'UNKNOWN({rcode})'
                     })
-                    self.stats['errors_by_type']['DNS_FAILURE'].append(pkt_num)
-        
-        # HTTP Error Detection
-        if pkt.haslayer(Raw):
-            try:
-                payload = pkt[Raw].load.decode('utf-8', errors='ignore')
-                
-                # HTTP error codes
-                if 'HTTP/' in payload:
-                    for error_code in ['400', '401', '403', '404', '500', '502', '503', '504']:
-                        if f'HTTP/1.1 {error_code}' in payload or f'HTTP/1.0 {error_code}' in payload:
-                            self.stats['http_errors'].append({
-                                'packet_num': pkt_num,
-                                'timestamp': timestamp,
-                                'src': f"{pkt[IP].src}:{pkt[TCP].sport}" if pkt.haslayer(IP) and pkt.haslayer(TCP) else 'unknown',
-                                'dst': f"{pkt[IP].dst}:{pkt[TCP].dport}" if pkt.haslayer(IP) and pkt.haslayer(TCP) else 'unknown',
-                                'status_code': error_code,
-                                'preview': payload[:200]
-                            })
-                            self.stats['errors_by_type'][f'HTTP_{error_code}'].append(pkt_num)
-                            break
-            except:
-                pass
-        
-        # Large packet detection (fragmentation issues)
-        if len(pkt) > 1400:
-            self.stats['large_packets'].append({
+                self._count_error('DNS_FAILURE', pkt_num)
+    
+    def _record_http(self, pkt_num, timestamp, load, flow):
+        """Keep HTTP error responses found in a packet payload (flow is None unless TCP/IPv4)"""
+        found = _find_http_errors(load)
+        if not found:
+            return
+        found = {code.decode() for code in found}
+        error_code = next(code for code in _HTTP_ERROR_CODES if code in found)
+        if self._keep_record('http_errors'):
+            src, dst = _flow_endpoints(flow) if flow is not None else ('unknown', 'unknown')
+            # 200 characters take at most 800 bytes of UTF-8; decode the rest only
+            # if ignored invalid bytes left the prefix short
+            preview = load[:800].decode('utf-8', errors='ignore')
+            if len(preview) < 200 and len(load) > 800:
+                preview = load.decode('utf-8', errors='ignore')
+            self.stats['http_errors'].append({
                 'packet_num': pkt_num,
                 'timestamp': timestamp,
-                'size': len(pkt),
-                'src': pkt[IP].src if pkt.haslayer(IP) else 'unknown',
-                'dst': pkt[IP].dst if pkt.haslayer(IP) else 'unknown'
+                'src': src,
+                'dst': dst,
+                'status_code': error_code,
+                'preview': preview[:200]
             })
+        self._count_error(f'HTTP_{error_code}', pkt_num)
     
-    def _dns_rcode_name(self, rcode):
-        """Convert DNS rcode to name"""
-        rcodes = {
-            0: 'NOERROR',
-            1: 'FORMERR',
-            2: 'SERVFAIL',
-            3: 'NXDOMAIN',
-            4: 'NOTIMP',
-            5: 'REFUSED'
-        }
-        return rcodes.get(rcode, f'UNKNOWN({rcode})')
+    def _record_large(self, pkt_num, timestamp, pkt_len, src, dst):
+        """Keep packets large enough to hint at fragmentation issues"""
+        if not self._keep_record('large_packets'):
+            return
+        self.stats['large_packets'].append({
+            'packet_num': pkt_num,
+            'timestamp': timestamp,
+            'size': pkt_len,
+            'src': src,
+            'dst': dst
+        })
+    
+    def _count_error(self, kind, pkt_num):
+        """Count one error of the given type for error_summary"""
+        errors = self.stats['errors_by_type']
+        if kind not in errors:
+            self.stats['error_first_packet'][kind] = pkt_num
+        errors[kind] += 1
+        self.stats['total_errors'] += 1
     
-    def analyze_all(self):
-        """Analyze all packets"""
-        print("Analyzing packets for errors and anomalies...")
-        for i, pkt in enumerate(self.packets):
-            if i % 5000 == 0 and i > 0:
-                print(f"  Processed {i}/{len(self.packets)} packets...")
-            self.analyze_packet(pkt, i + 1)
-        print(f"Analysis complete: {len(self.packets)} packets processed")
+    def _keep_record(self, kind):
+        """Count one record of a capped list; True while the list is below its limit"""
+        counts = self.stats['record_counts']
+        counts[kind] += 1
+        return counts[kind] <= RECORD_LIMITS[kind]
+    
+    def _dissect(self, buf, linktype, timestamp):
+        """Build a scapy packet from raw bytes the same way PcapReader does"""
+        cls = conf.l2types.num2layer.get(linktype, conf.raw_layer)
+        try:
+            pkt = cls(buf)
+        except Exception:
+            pkt = conf.raw_layer(buf)
+        if timestamp is not None:
+            pkt.time = timestamp
+        return pkt
+    
+    def analyze_all(self, jobs=1, packet_range=None):
+        """Analyze all packets, streaming them from the capture file
+        
+        With jobs > 1 the capture is split into packet ranges analyzed by worker
+        processes; packet_range=(start, stop) limits a worker to its own range.
+        """
+        if jobs > 1:
+            return self._analyze_parallel(jobs)
+        if self._reader is None:
+            self.load_packets()
+        
+        quiet = self._quiet
+        if not quiet:
+            print("Analyzing packets for errors and anomalies...")
+        reader = self._reader
+        is_pcapng = isinstance(reader, RawPcapNgReader)
+        ts_scale = 1_000_000_000 if getattr(reader, 'nano', False) else 1_000_000
+        start, stop = packet_range if packet_range is not None else (1, None)
+        next_progress = time.monotonic() + PROGRESS_INTERVAL
+        
+        # Bind per-packet calls to locals; attribute lookups add up in this loop
+        stats = self.stats
+        analyze_raw = self._analyze_raw
+        analyze_packet = self.analyze_packet
+        dissect = self._dissect
+        try:
+            for pkt_num, (buf, meta) in enumerate(reader, 1):
+                if pkt_num < start:
+                    continue
+                if pkt_num == stop:
+                    break
+                stats['total_packets'] = pkt_num
+                
+                # Exact integer division gives the same float as scapy's Decimal time
+                if is_pcapng:
+                    linktype = meta.linktype
+                    timestamp = (((meta.tshigh << 32) + meta.tslow) / meta.tsresol
+                                 if meta.tshigh is not None else None)
+                else:
+                    linktype = reader.linktype
+                    timestamp = (meta.sec * ts_scale + meta.usec) / ts_scale
+                
+                if timestamp is None or not analyze_raw(buf, linktype, timestamp, pkt_num):
+                    analyze_packet(dissect(buf, linktype, timestamp), pkt_num)
+                
+                # Every 4096 packets: fold in the tallies and report progress by time
+                if not pkt_num & 0xFFF:
+                    self._flush_tallies()
+                    if not quiet and time.monotonic() >= next_progress:
+                        print(f"  Processed {pkt_num:,} packets...")
+                        next_progress = time.monotonic() + PROGRESS_INTERVAL
+        finally:
+            self._flush_tallies()
+            reader.close()
+            self._reader = None
+        
+        if not quiet:
+            print(f"Analysis complete: {self.stats['total_packets']:,} packets processed")
+    
+    def _analyze_parallel(self, jobs):
+        """Analyze contiguous packet ranges in worker processes and merge their stats"""
+        if self._reader is None:
+            self.load_packets()
+        
+        # Count packets first so every worker gets an equal range
+        try:
+            total = sum(1 for _ in self._reader)
+        finally:
+            self._reader.close()
+            self._reader = None
+        
+        print(f"Analyzing packets for errors and anomalies ({jobs} processes)...")
+        bounds = [total * i // jobs + 1 for i in range(jobs + 1)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            shards = list(pool.map(_analyze_shard, [self.pcap_file] * jobs, bounds[:-1], bounds[1:],
+                                   [i == 0 for i in range(jobs)]))
+        self._merge_stats(shards)
+        self.stats['total_packets'] = total
+        
+        print(f"Analysis complete: {self.stats['total_packets']:,} packets processed")
+    
+    def _merge_stats(self, shards):
+        """Combine per-range stats in packet order, as a single pass would have built them"""
+        stats = self.stats
+        
+        # Segments a later range saw first are retransmissions if an earlier range saw them
+        resent = []
+        seen = set()
+        for shard_stats, shard_seen, first_segments in shards:
+            if first_segments is not None:
+                keys, nums, times, flows_hi, flows_lo, seqs, lengths = first_segments
+                for i, seq_key in enumerate(keys):
+                    if seq_key in seen:
+                        resent.append(_retransmission(nums[i], times[i], (flows_hi[i] << 64) | flows_lo[i],
+                                                      seqs[i], lengths[i]))
+            seen |= shard_seen
+        
+        # Ranges are in packet order, so updating in turn keeps first-seen key order
+        ranges = [shard[0] for shard in shards]
+        for key in ('protocols', 'src_ips', 'dst_ips', 'src_ports', 'dst_ports', 'dns_queries'):
+            for part in ranges:
+                stats[key].update(part[key])
+        for part in ranges:
+            for slot in part['tcp_flags_order']:
+                if not stats['tcp_flags'][slot]:
+                    stats['tcp_flags_order'].append(slot)
+                stats['tcp_flags'][slot] += part['tcp_flags'][slot]
+        
+        # Each range kept its first records, so the first of their union are the global first
+        for part in ranges:
+            stats['record_counts'].update(part['record_counts'])
+        stats['record_counts']['tcp_retransmissions'] += len(resent)
+        for key in ('dns_failures', 'http_errors', 'tcp_resets', 'connection_failures', 'large_packets'):
+            for part in ranges:
+                stats[key].extend(part[key])
+            del stats[key][RECORD_LIMITS[key]:]
+        stats['tcp_retransmissions'] = list(heapq.merge(
+            *(part['tcp_retransmissions'] for part in ranges), resent, key=itemgetter('packet_num')
+        ))[:RECORD_LIMITS['tcp_retransmissions']]
+        
+        # Error types keep first-seen order; boundary retransmissions may come first
+        first_packet = stats['error_first_packet']
+        for part in ranges:
+            for error_type, pkt_num in part['error_first_packet'].items():
+                first_packet.setdefault(error_type, pkt_num)
+        if resent:
+            first_packet['TCP_RETRANSMISSION'] = min(first_packet.get('TCP_RETRANSMISSION', resent[0]['packet_num']),
+                                                     resent[0]['packet_num'])
+        totals = Counter()
+        for part in ranges:
+            totals.update(part['errors_by_type'])
+        totals['TCP_RETRANSMISSION'] += len(resent)
+        for error_type in sorted(first_packet, key=first_packet.get):
+            stats['errors_by_type'][error_type] = totals[error_type]
+        stats['total_errors'] = sum(part['total_errors'] for part in ranges) + len(resent)
+        
+        for part in ranges:
+            for flow, part_conv in part['conversations'].items():
+                conv = stats['conversations'][flow]
+                conv['packets'] += part_conv['packets']
+                conv['bytes'] += part_conv['bytes']
+                if conv['first_seen'] is None:
+                    conv['first_seen'] = part_conv['first_seen']
+                conv['last_seen'] = part_conv['last_seen']
+                conv['flags'].update(part_conv['flags'])
     
     def generate_summary(self):
         """Generate executive summary optimized for AI"""
@@ -286,59 +857,58 @@ class PCAPAnalysisPrep:
                 'file_size_mb': os.path.getsize(self.pcap_file) / (1024*1024)
             },
             'protocol_distribution': dict(self.stats['protocols'].most_common()),
-            'top_sources': [{'ip': ip, 'packets': count} for ip, count in self.stats['src_ips'].most_common(10)],
-            'top_destinations': [{'ip': ip, 'packets': count} for ip, count in self.stats['dst_ips'].most_common(10)],
+            'top_sources': [{'ip': _int_to_ip(ip), 'packets': count} for ip, count in self.stats['src_ips'].most_common(10)],
+            'top_destinations': [{'ip': _int_to_ip(ip), 'packets': count} for ip, count in self.stats['dst_ips'].most_common(10)],
             'top_ports': {
                 'source': [{'port': port, 'packets': count} for port, count in self.stats['src_ports'].most_common(10)],
                 'destination': [{'port': port, 'packets': count} for port, count in self.stats['dst_ports'].most_common(10)]
             },
-            'tcp_flags_distribution': dict(self.stats['tcp_flags'].most_common(10)),
+            'tcp_flags_distribution': dict(self._tcp_flag_counts().most_common(10)),
             'error_summary': {
-                'total_errors': sum(len(v) if isinstance(v, list) else 0 for v in self.stats['errors_by_type'].values()),
-                'error_types': {k: len(v) if isinstance(v, list) else 0 for k, v in self.stats['errors_by_type'].items()},
-                'tcp_resets': len(self.stats['tcp_resets']),
-                'tcp_retransmissions': len(self.stats['tcp_retransmissions']),
-                'dns_failures': len(self.stats['dns_failures']),
-                'http_errors': len(self.stats['http_errors']),
-                'connection_failures': len(self.stats['connection_failures'])
+                'total_errors': self.stats['total_errors'],
+                'error_types': dict(self.stats['errors_by_type']),
+                'tcp_resets': self.stats['record_counts']['tcp_resets'],
+                'tcp_retransmissions': self.stats['record_counts']['tcp_retransmissions'],
+                'dns_failures': self.stats['record_counts']['dns_failures'],
+                'http_errors': self.stats['record_counts']['http_errors'],
+                'connection_failures': self.stats['record_counts']['connection_failures']
             },
             'top_dns_queries': [{'domain': domain, 'count': count} for domain, count in self.stats['dns_queries'].most_common(20)]
         }
         return summary
     
+    def _tcp_flag_counts(self):
+        """Turn the TCP flag histogram into a Counter of flag names, in first-seen order"""
+        flag_hist = self.stats['tcp_flags']
+        return Counter({TCP_FLAG_NAMES[slot]: flag_hist[slot] for slot in self.stats['tcp_flags_order']})
+    
     def generate_error_details(self):
         """Generate detailed error information"""
-        return {
-            'tcp_resets': self.stats['tcp_resets'][:50],  # Limit to first 50
-            'tcp_retransmissions': self.stats['tcp_retransmissions'][:50],
-            'dns_failures': self.stats['dns_failures'][:50],
-            'http_errors': self.stats['http_errors'][:50],
-            'connection_failures': self.stats['connection_failures'][:30],
-            'large_packets': self.stats['large_packets'][:20]
-        }
+        # The record lists are capped at RECORD_LIMITS while analyzing
+        return {kind: self.stats[kind] for kind in RECORD_LIMITS}
     
     def generate_conversation_summary(self):
         """Summarize top conversations"""
         conversations = []
-        for conv_key, conv_data in sorted(
+        for flow, conv_data in sorted(
             self.stats['conversations'].items(),
             key=lambda x: x[1]['packets'],
             reverse=True
         )[:20]:  # Top 20 conversations
             duration = conv_data['last_seen'] - conv_data['first_seen'] if conv_data['first_seen'] else 0
             
-            # Convert flags to JSON-serializable format
-            flags_counter = Counter()
-            for flag in conv_data['flags']:
-                # Convert FlagValue to string
-                flags_counter[str(flag)] += 1
+            # Render flag bits as scapy's letters (e.g. 'SA', 'PA')
+            flags_summary = [
+                {'flag': ''.join(c for i, c in enumerate(TCP_FLAG_LETTERS) if flag >> i & 1), 'count': count}
+                for flag, count in conv_data['flags'].most_common(5)
+            ]
             
             conversations.append({
-                'conversation': conv_key,
+                'conversation': ' -> '.join(_flow_endpoints(flow)),
                 'packets': conv_data['packets'],
                 'bytes': conv_data['bytes'],
                 'duration_seconds': round(duration, 3),
-                'flags_summary': [{'flag': flag, 'count': count} for flag, count in flags_counter.most_common(5)]
+                'flags_summary': flags_summary
             })
         return conversations
     
@@ -355,7 +925,7 @@ I need help analyzing a network packet capture from an Azure AKS escalation. The
 - **Capture Source**: {summary['metadata']['source_file']}
 
 ### Protocol Distribution
-{json.dumps(summary['protocol_distribution'], indent=2)}
+{_to_json(summary['protocol_distribution']).decode()}
 
 ### Top Error Counts
 - TCP Resets: {summary['error_summary']['tcp_resets']}
@@ -365,38 +935,38 @@ I need help analyzing a network packet capture from an Azure AKS escalation. The
 - Connection Failures: {summary['error_summary']['connection_failures']}
 
 ## Top Traffic Sources
-{json.dumps(summary['top_sources'][:5], indent=2)}
+{_to_json(summary['top_sources'][:5]).decode()}
 
 ## Top Traffic Destinations
-{json.dumps(summary['top_destinations'][:5], indent=2)}
+{_to_json(summary['top_destinations'][:5]).decode()}
 
 ## Top Destination Ports (Indicating Services)
-{json.dumps(summary['top_ports']['destination'][:10], indent=2)}
+{_to_json(summary['top_ports']['destination'][:10]).decode()}
 
 ## Critical Errors Detected
 
 ### TCP Resets (Connection Terminations)
 ```json
-{json.dumps(errors['tcp_resets'][:10], indent=2)}
+{_to_json(errors['tcp_resets'][:10]).decode()}
 ```
 
 ### TCP Retransmissions (Network Issues)
 ```json
-{json.dumps(errors['tcp_retransmissions'][:10], indent=2)}
+{_to_json(errors['tcp_retransmissions'][:10]).decode()}
 ```
 
 ### DNS Failures
 ```json
-{json.dumps(errors['dns_failures'][:10], indent=2)}
+{_to_json(errors['dns_failures'][:10]).decode()}
 ```
 
 ### HTTP Errors
 ```json
-{json.dumps(errors['http_errors'][:5], indent=2)}
+{_to_json(errors['http_errors'][:5]).decode()}
 ```
 
 ## Top Network Conversations
-{json.dumps(conversations[:10], indent=2)}
+{_to_json(conversations[:10]).decode()}
 
 ## Analysis Questions
 
@@ -430,26 +1000,26 @@ Please provide:
         
         # 1. Executive Summary (JSON) - Most compact
         summary_file = os.path.join(output_dir, 'summary.json')
-        with open(summary_file, 'w') as f:
-            json.dump(summary, f, indent=2)
+        with open(summary_file, 'wb') as f:
+            f.write(_to_json(summary))
         print(f"✓ Created: {summary_file}")
         
         # 2. Error Details (JSON)
         errors_file = os.path.join(output_dir, 'errors_detailed.json')
-        with open(errors_file, 'w') as f:
-            json.dump(errors, f, indent=2)
+        with open(errors_file, 'wb') as f:
+            f.write(_to_json(errors))
         print(f"✓ Created: {errors_file}")
         
         # 3. Conversations (JSON)
         conv_file = os.path.join(output_dir, 'conversations.json')
-        with open(conv_file, 'w') as f:
-            json.dump(conversations, f, indent=2)
+        with open(conv_file, 'wb') as f:
+            f.write(_to_json(conversations))
         print(f"✓ Created: {conv_file}")
         
         # 4. AI Prompt Template (Markdown) - Ready to paste
         prompt = self.generate_ai_prompt_template(summary, errors, conversations)
         prompt_file = os.path.join(output_dir, 'ai_analysis_prompt.md')
-        with open(prompt_file, 'w') as f:
+        with open(prompt_file, 'w', encoding='utf-8') as f:
             f.write(prompt)
         print(f"✓ Created: {prompt_file}")
         
@@ -530,6 +1100,9 @@ Examples:
   
   # Use default output directory
   python prepare_for_ai_analysis.py --input sanitized.cap
+  
+  # Split a large capture across 4 processes
+  python prepare_for_ai_analysis.py --input sanitized.cap --jobs 4
         """
     )
     
@@ -545,6 +1118,13 @@ Examples:
         help='Output directory for analysis files (default: ai_analysis/)'
     )
     
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Worker processes for packet analysis (default: 1)'
+    )
+    
     try:
         args = parser.parse_args()
     except SystemExit:
@@ -553,6 +1133,10 @@ Examples:
     pcap_file = args.input
     output_dir = args.output_dir
     
+    if args.jobs < 1:
+        print("❌ Error: --jobs must be at least 1", file=sys.stderr)
+        sys.exit(1)
+    
     try:
         # Validate input file
         if not pcap_file:
@@ -609,12 +1193,12 @@ Examples:
             print("Loading packets...")
             analyzer.load_packets()
             
+            print("Analyzing packets...")
+            analyzer.analyze_all(jobs=args.jobs)
+            
             if analyzer.stats['total_packets'] == 0:
                 print(f"❌ Error: No valid packets found in PCAP file: {pcap_file}", file=sys.stderr)
                 sys.exit(1)
-                
-            print("Analyzing packets...")
-            analyzer.analyze_all()
             
         except MemoryError:
             print(f"❌ Error: Out of memory while processing PCAP file (file too large)", file=sys.stderr)
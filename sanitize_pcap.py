@@ -25,35 +25,154 @@ Sanitizes:
 
 import os
 import sys
+import shutil
 import hashlib
+import tempfile
+import time
+import socket
 import ipaddress
-from scapy.all import rdpcap, wrpcap, IP, IPv6, Ether, DNS, DNSQR, DNSRR, Raw, TCP, UDP
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from scapy.all import PcapReader, PcapWriter, IP, IPv6, Ether, DNS, DNSQR, DNSRR, Raw, Padding, NoPayload, TCP, UDP
+from scapy.utils import checksum
 from scapy.layers.http import HTTPRequest, HTTPResponse
 from scapy.layers.tls.all import TLS, TLSClientHello, TLSServerHello
 import re
 from datetime import datetime
 
+try:
+    import re2
+except ImportError:  # Optional: linear-time RE2 matching for the API-key patterns
+    re2 = None
+
+# Input buffer for PcapReader; a large buffer turns many small reads into few big ones
+DEFAULT_READ_BUFFER = 1 << 20  # 1 MiB
+
+# Seconds between "Processing packet N..." progress lines
+PROGRESS_INTERVAL = 1.0
+
+# Sanitization stops once this many packets have failed; only the first few are reported
+MAX_ERRORS = 100
+MAX_ERROR_WARNINGS = 10
+
+# Output buffer for PcapWriter (scapy's default is 4 KiB), flushed when the writer closes
+WRITE_BUFFER = 1 << 20  # 1 MiB
+
+# Initialised 8-byte BLAKE2b state for pseudonyms; copying it is cheaper than constructing
+# a hasher per value. Module level, since hashlib objects cannot be pickled for --jobs
+_PSEUDONYM_HASH = hashlib.blake2b(digest_size=8)
+
+# pcap global header written by PcapWriter ahead of the packet records
+PCAP_HEADER_LEN = 24
+
+# Potential API keys, redacted in this order. Inline flags and an explicit whitespace
+# class (RE2's \s lacks \v) keep each pattern identical under re and RE2
+API_KEY_PATTERNS = (
+    rb'\b[A-Za-z0-9]{32,}\b',  # Generic long strings
+    rb'(?i)Bearer[ \t\n\r\f\v]+[A-Za-z0-9\-._~+/]+=*',
+    rb'(?i)api[_-]?key[" \t\n\r\f\v:=]+[A-Za-z0-9]+',
+    rb'(?i)token[" \t\n\r\f\v:=]+[A-Za-z0-9]+',
+)
+
+# Payload where RE2 and re could still disagree: vertical tab, non-ASCII case folds
+# (long s, Kelvin sign) and invalid UTF-8 next to key-like text
+_RE2_PROBE = (b'apiKey:\x0bABC tok\xc5\xbfen: \xe2\x84\xaa1 BEARER\xff xyz= api-key=Q ' +
+              b'0' * 40 + b'\xff' + b'a' * 33 + b'_' + b'Z' * 32)
+
+def _compile_api_key_pattern(pattern):
+    """Compile with RE2 if it is installed and redacts the probe exactly like re"""
+    compiled = re.compile(pattern)
+    if re2 is not None:
+        try:
+            fast = re2.compile(pattern)
+            if fast.subn(b'[KEY_REDACTED]', _RE2_PROBE) == compiled.subn(b'[KEY_REDACTED]', _RE2_PROBE):
+                return fast
+        except Exception:
+            pass
+    return compiled
+
+def _is_shared_mac(mac):
+    """True for MACs that identify no host: all-zero, broadcast and IPv4/IPv6 multicast
+    
+    IPv6 solicited-node multicast (33:33:ff:...) carries the low 24 bits of a host
+    address, so it is still anonymized.
+    """
+    return (mac == "00:00:00:00:00:00" or mac == "ff:ff:ff:ff:ff:ff" or mac.startswith("01:00:5e:")
+            or (mac.startswith("33:33:") and not mac.startswith("33:33:ff:")))
+
+def _skip_packets(reader, count=None):
+    """Advance a PcapReader past count packets (all if None) without dissecting them
+    
+    Returns the number of packets skipped.
+    """
+    skipped = 0
+    try:
+        while (count is None or skipped < count) and reader._read_packet() is not None:
+            skipped += 1
+    except EOFError:
+        pass
+    return skipped
+
+def _sanitize_shard(sanitizer, input_file, part_file, start, stop):
+    """--jobs worker: sanitize packets start..stop-1 into part_file and return what the merge needs"""
+    with sanitizer._open_reader(input_file) as reader, PcapWriter(part_file, sync=False, bufsz=WRITE_BUFFER) as writer:
+        _skip_packets(reader, start)
+        # Number packets as in the whole capture so warnings match a single-process run
+        sanitizer.stats['total_packets'] = start
+        # Failures are reported and counted against MAX_ERRORS across all ranges by the parent
+        failures = []
+        counts = sanitizer._sanitize_stream(reader, writer, start, stop, failures)
+    return sanitizer.stats, sanitizer.ip_map, sanitizer.mac_map, sanitizer.domain_map, counts, failures
+
+def _join_pcap_parts(parts, output_file):
+    """Concatenate --jobs part files under the header of the first non-empty part"""
+    with open(output_file, 'wb') as out:
+        header_written = False
+        for part in parts:
+            with open(part, 'rb') as f:
+                header = f.read(PCAP_HEADER_LEN)
+                records = f.read(1)
+                if not records:
+                    continue  # no packets written in this range
+                if not header_written:
+                    out.write(header)
+                    header_written = True
+                out.write(records)
+                shutil.copyfileobj(f, out, WRITE_BUFFER)
+
 class PCAPSanitizer:
-    def __init__(self, preserve_internal_ips=True):
+    # Compiled once per process; a class attribute is not pickled with the sanitizer
+    # handed to --jobs workers, which RE2 patterns could not survive
+    api_key_patterns = [_compile_api_key_pattern(pattern) for pattern in API_KEY_PATTERNS]
+    
+    def __init__(self, preserve_internal_ips=True, read_buffer=DEFAULT_READ_BUFFER, crypto_hash=False):
         """
         Initialize the sanitizer
         
         Args:
             preserve_internal_ips: If True, keeps private IP ranges recognizable (10.x, 172.16.x, 192.168.x)
+            read_buffer: Input file buffer size in bytes
+            crypto_hash: If True, derives pseudonyms from SHA-256 (as earlier releases did) instead of BLAKE2b
         """
         self.ip_map = {}
         self.mac_map = {}
         self.domain_map = {}
         self.preserve_internal_ips = preserve_internal_ips
+        self.read_buffer = read_buffer
+        self.crypto_hash = crypto_hash
         
-        # Patterns to detect sensitive data
-        self.email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
-        self.api_key_patterns = [
-            re.compile(r'\b[A-Za-z0-9]{32,}\b'),  # Generic long strings
-            re.compile(r'Bearer\s+[A-Za-z0-9\-._~+/]+=*', re.IGNORECASE),
-            re.compile(r'api[_-]?key["\s:=]+[A-Za-z0-9]+', re.IGNORECASE),
-            re.compile(r'token["\s:=]+[A-Za-z0-9]+', re.IGNORECASE),
+        # Patterns to detect sensitive data, matched against raw payload bytes
+        # (api_key_patterns are shared by the class)
+        self.email_pattern = re.compile(rb'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+        self.sensitive_headers = [
+            b'Authorization:', b'Cookie:', b'Set-Cookie:',
+            b'X-API-Key:', b'X-Auth-Token:', b'User-Agent:',
+            b'X-Forwarded-For:', b'X-Real-IP:'
         ]
+        # Every header value runs to the end of its line, so one alternation redacts
+        # exactly what a pass per header would
+        self.header_pattern = re.compile(
+            b'(' + b'|'.join(re.escape(header) for header in self.sensitive_headers) + rb')[^\r\n]*')
         
         self.stats = {
             'total_packets': 0,
@@ -66,74 +185,77 @@ class PCAPSanitizer:
         }
     
     def _hash_value(self, value, prefix=''):
-        """Create a consistent hash for anonymization"""
-        hash_obj = hashlib.sha256(f"{value}".encode())
-        return prefix + hash_obj.hexdigest()[:16]
+        """Create a consistent 16-hex-digit hash for anonymization"""
+        data = f"{value}".encode()
+        if self.crypto_hash:
+            return prefix + hashlib.sha256(data).hexdigest()[:16]
+        # Pseudonyms only need to be consistent; 8-byte BLAKE2b is cheaper than truncated SHA-256
+        hasher = _PSEUDONYM_HASH.copy()
+        hasher.update(data)
+        return prefix + hasher.hexdigest()
     
     def anonymize_ip(self, ip_str):
         """Anonymize IP address while maintaining consistency"""
-        if ip_str in self.ip_map:
-            return self.ip_map[ip_str]
+        # One dict lookup on the hit path, which nearly every packet takes
+        anon_ip = self.ip_map.get(ip_str)
+        if anon_ip is not None:
+            return anon_ip
         
         try:
             ip_obj = ipaddress.ip_address(ip_str)
-            
-            # Check if it's a private IP
-            if ip_obj.is_private and self.preserve_internal_ips:
-                # Keep private IPs in their ranges but anonymize last octets
-                if isinstance(ip_obj, ipaddress.IPv4Address):
-                    octets = ip_str.split('.')
-                    if octets[0] == '10':
-                        anon_ip = f"10.{self._hash_value(ip_str, '')[:3]}.{self._hash_value(ip_str, '')[3:6]}.{self._hash_value(ip_str, '')[6:9]}"
-                        anon_ip = f"10.{int(self._hash_value(ip_str, '')[:2], 16) % 256}.{int(self._hash_value(ip_str, '')[2:4], 16) % 256}.{int(self._hash_value(ip_str, '')[4:6], 16) % 256}"
-                    elif octets[0] == '172' and 16 <= int(octets[1]) <= 31:
-                        anon_ip = f"172.{16 + int(self._hash_value(ip_str, '')[0:2], 16) % 16}.{int(self._hash_value(ip_str, '')[2:4], 16) % 256}.{int(self._hash_value(ip_str, '')[4:6], 16) % 256}"
-                    elif octets[0] == '192' and octets[1] == '168':
-                        anon_ip = f"192.168.{int(self._hash_value(ip_str, '')[:2], 16) % 256}.{int(self._hash_value(ip_str, '')[2:4], 16) % 256}"
-                    else:
-                        anon_ip = f"10.{int(self._hash_value(ip_str, '')[:2], 16) % 256}.{int(self._hash_value(ip_str, '')[2:4], 16) % 256}.{int(self._hash_value(ip_str, '')[4:6], 16) % 256}"
-                else:
-                    # IPv6 private - simplified anonymization
-                    anon_ip = f"fd00::{self._hash_value(ip_str, '')[:8]}"
-            else:
-                # Public IPs - map to different public range
-                if isinstance(ip_obj, ipaddress.IPv4Address):
-                    # Use 203.0.113.0/24 (TEST-NET-3) for anonymized public IPs
-                    anon_ip = f"203.0.113.{int(self._hash_value(ip_str, '')[:2], 16) % 256}"
-                else:
-                    # IPv6 public - use documentation prefix
-                    anon_ip = f"2001:db8::{self._hash_value(ip_str, '')[:8]}"
-            
-            self.ip_map[ip_str] = anon_ip
-            return anon_ip
-            
         except ValueError:
             return ip_str
+        
+        # Hash once; pseudonym octets are the leading digest bytes
+        hashed = self._hash_value(ip_str, '')
+        h0, h1, h2 = bytes.fromhex(hashed[:6])
+        
+        # Check if it's a private IP
+        if ip_obj.is_private and self.preserve_internal_ips:
+            # Keep private IPs in their ranges but anonymize last octets
+            if ip_obj.version == 4:
+                first, second = ip_obj.packed[:2]
+                if first == 172 and 16 <= second <= 31:
+                    anon_ip = f"172.{16 + h0 % 16}.{h1}.{h2}"
+                elif first == 192 and second == 168:
+                    anon_ip = f"192.168.{h0}.{h1}"
+                else:
+                    anon_ip = f"10.{h0}.{h1}.{h2}"
+            else:
+                # IPv6 private - simplified anonymization
+                anon_ip = f"fd00::{hashed[:8]}"
+        else:
+            # Public IPs - map to different public range
+            if ip_obj.version == 4:
+                # Use 203.0.113.0/24 (TEST-NET-3) for anonymized public IPs
+                anon_ip = f"203.0.113.{h0}"
+            else:
+                # IPv6 public - use documentation prefix
+                anon_ip = f"2001:db8::{hashed[:8]}"
+        
+        self.ip_map[ip_str] = anon_ip
+        return anon_ip
     
     def anonymize_mac(self, mac_str):
         """Anonymize MAC address"""
-        if mac_str in self.mac_map:
-            return self.mac_map[mac_str]
+        anon_mac = self.mac_map.get(mac_str)
+        if anon_mac is not None:
+            return anon_mac
         
         # Keep the OUI (first 3 bytes) as 00:00:00 and hash the rest
-        hash_part = self._hash_value(mac_str, '')[:6]
-        anon_mac = f"00:00:00:{hash_part[0:2]}:{hash_part[2:4]}:{hash_part[4:6]}"
+        anon_mac = '00:00:00:' + bytes.fromhex(self._hash_value(mac_str, '')[:6]).hex(':')
         self.mac_map[mac_str] = anon_mac
         return anon_mac
     
     def anonymize_domain(self, domain):
         """Anonymize domain names"""
-        if domain in self.domain_map:
-            return self.domain_map[domain]
+        anon_domain = self.domain_map.get(domain)
+        if anon_domain is not None:
+            return anon_domain
         
         # Keep TLD recognizable, hash the rest
-        parts = domain.split('.')
-        if len(parts) >= 2:
-            tld = parts[-1]
-            hashed = self._hash_value(domain, '')[:12]
-            anon_domain = f"anon-{hashed}.{tld}"
-        else:
-            anon_domain = f"anon-{self._hash_value(domain, '')[:12]}.local"
+        _, dot, tld = domain.rpartition('.')
+        anon_domain = f"anon-{self._hash_value(domain, '')[:12]}.{tld if dot else 'local'}"
         
         self.domain_map[domain] = anon_domain
         return anon_domain
@@ -151,58 +273,44 @@ class PCAPSanitizer:
                 self.stats['dns_sanitized'] += 1
             
             # Sanitize answers
-            if dns.an:
-                for i in range(dns.ancount):
-                    try:
-                        if dns.an[i].rdata:
-                            rdata = dns.an[i].rdata
-                            if isinstance(rdata, bytes):
-                                # Could be a domain name or IP
-                                rdata_str = rdata.decode('utf-8', errors='ignore').rstrip('.')
-                                if '.' in rdata_str and not rdata_str[0].isdigit():
-                                    anon_rdata = self.anonymize_domain(rdata_str)
-                                    dns.an[i].rdata = anon_rdata.encode() + b'.'
-                    except:
-                        pass
+            # Records without rdata (SOA, MX, SRV, ...) are left alone
+            for rr in dns.an or ():
+                rdata = getattr(rr, 'rdata', None)
+                if rdata and isinstance(rdata, bytes):
+                    # Could be a domain name or IP
+                    rdata_str = rdata.decode('utf-8', errors='ignore').rstrip('.')
+                    if '.' in rdata_str and not rdata_str[0].isdigit():
+                        rr.rdata = self.anonymize_domain(rdata_str).encode() + b'.'
         
         return packet
     
     def sanitize_http(self, packet):
         """Sanitize HTTP headers and payloads"""
-        if packet.haslayer(Raw):
+        raw = packet.getlayer(Raw)
+        if raw is not None:
             try:
-                payload = packet[Raw].load
+                payload = raw.load
                 
-                # Check if it looks like HTTP
+                # Check if it looks like HTTP; separate substring scans are faster than
+                # a single regex search over the whole payload
                 if b'HTTP/' in payload or b'GET ' in payload or b'POST ' in payload:
-                    payload_str = payload.decode('utf-8', errors='ignore')
-                    
-                    # Remove common sensitive headers
-                    sensitive_headers = [
-                        'Authorization:', 'Cookie:', 'Set-Cookie:', 
-                        'X-API-Key:', 'X-Auth-Token:', 'User-Agent:',
-                        'X-Forwarded-For:', 'X-Real-IP:'
-                    ]
-                    
-                    for header in sensitive_headers:
-                        if header in payload_str:
-                            # Replace header value with [REDACTED]
-                            pattern = f'{header}[^\r\n]*'
-                            payload_str = re.sub(pattern, f'{header} [REDACTED]', payload_str)
-                            self.stats['http_sanitized'] += 1
+                    # Remove common sensitive headers in one pass, counting each header once
+                    found_headers = set()
+                    def redact_header(match):
+                        found_headers.add(match.group(1))
+                        return match.group(1) + b' [REDACTED]'
+                    payload = self.header_pattern.sub(redact_header, payload)
+                    self.stats['http_sanitized'] += len(found_headers)
                     
-                    # Remove email addresses
-                    if self.email_pattern.search(payload_str):
-                        payload_str = self.email_pattern.sub('[EMAIL_REDACTED]', payload_str)
-                        self.stats['sensitive_data_removed'] += 1
-                    
-                    # Remove potential API keys
-                    for pattern in self.api_key_patterns:
-                        if pattern.search(payload_str):
-                            payload_str = pattern.sub('[KEY_REDACTED]', payload_str)
+                    # Remove email addresses, then potential API keys. These patterns can
+                    # overlap, so they stay separate passes in priority order
+                    for pattern, replacement in ((self.email_pattern, b'[EMAIL_REDACTED]'),
+                                                 *((p, b'[KEY_REDACTED]') for p in self.api_key_patterns)):
+                        payload, count = pattern.subn(replacement, payload)
+                        if count:
                             self.stats['sensitive_data_removed'] += 1
                     
-                    packet[Raw].load = payload_str.encode('utf-8', errors='ignore')
+                    raw.load = payload
             except:
                 pass
         
@@ -230,10 +338,10 @@ class PCAPSanitizer:
             # Anonymize Ethernet layer
             if packet.haslayer(Ether):
                 ether = packet[Ether]
-                if ether.src != "00:00:00:00:00:00":
+                if not _is_shared_mac(ether.src):
                     ether.src = self.anonymize_mac(ether.src)
                     self.stats['mac_anonymized'] += 1
-                if ether.dst != "00:00:00:00:00:00":
+                if not _is_shared_mac(ether.dst):
                     ether.dst = self.anonymize_mac(ether.dst)
                     self.stats['mac_anonymized'] += 1
             
@@ -244,12 +352,13 @@ class PCAPSanitizer:
                 ip.dst = self.anonymize_ip(ip.dst)
                 self.stats['ip_anonymized'] += 2
                 
-                # Remove IP checksums to be recalculated
-                del ip.chksum
-                if packet.haslayer(TCP):
-                    del packet[TCP].chksum
-                elif packet.haslayer(UDP):
-                    del packet[UDP].chksum
+                # Clear IP and transport checksums so scapy recalculates them on build
+                ip.chksum = None
+                l4 = packet.getlayer(TCP)
+                if l4 is None:
+                    l4 = packet.getlayer(UDP)
+                if l4 is not None:
+                    l4.chksum = None
             
             # Anonymize IPv6
             if packet.haslayer(IPv6):
@@ -272,8 +381,214 @@ class PCAPSanitizer:
         
         return packet
     
-    def sanitize_file(self, input_file, output_file):
-        """Sanitize entire PCAP file with comprehensive error handling"""
+    def _rewrite_l2l3(self, packet):
+        """Sanitize a plain Ether/IPv4/TCP|UDP packet by editing its captured bytes
+        
+        Produces the same bytes as sanitize_packet() and a scapy rebuild, for packets
+        needing only address rewrites and fresh checksums. Returns (bytes, wirelen),
+        or None for anything else (IP options, IPv6, DNS/TLS/HTTP or other dissected
+        payloads).
+        """
+        ip = packet.payload
+        if type(packet) is not Ether or type(ip) is not IP or ip.ihl != 5 or ip.len < 20:
+            return None
+        l4 = ip.payload
+        l4_type = type(l4)
+        if l4_type is TCP:
+            if l4.dataofs < 5 or len(packet.original) < 34 + l4.dataofs * 4:
+                return None
+            if l4.dataofs > 5:
+                # Malformed or truncated options do not survive scapy's rebuild, so
+                # only keep option bytes it would encode identically
+                try:
+                    options = l4.get_field('options').i2m(l4, l4.options)
+                except Exception:
+                    return None
+                if options != packet.original[54:34 + l4.dataofs * 4]:
+                    return None
+        elif l4_type is not UDP or l4.len < 8 or len(packet.original) < 42:
+            return None
+        if type(l4.payload) not in (Raw, Padding, NoPayload):
+            return None
+        buf = bytearray(packet.original)
+        if b'HTTP/' in buf or b'GET ' in buf or b'POST ' in buf:
+            return None
+        self.stats['total_packets'] += 1
+        
+        # Setting an Ether field drops scapy's wirelen, so the record then reports
+        # its captured length; keep that behaviour
+        wirelen = packet.wirelen
+        if not _is_shared_mac(packet.dst):
+            buf[0:6] = bytes.fromhex(self.anonymize_mac(packet.dst).replace(':', ''))
+            self.stats['mac_anonymized'] += 1
+            wirelen = None
+        if not _is_shared_mac(packet.src):
+            buf[6:12] = bytes.fromhex(self.anonymize_mac(packet.src).replace(':', ''))
+            self.stats['mac_anonymized'] += 1
+            wirelen = None
+        
+        src = socket.inet_aton(self.anonymize_ip(ip.src))
+        dst = socket.inet_aton(self.anonymize_ip(ip.dst))
+        self.stats['ip_anonymized'] += 2
+        buf[26:30] = src
+        buf[30:34] = dst
+        buf[24:26] = b'\0\0'
+        buf[24:26] = checksum(bytes(buf[14:34])).to_bytes(2, 'big')
+        
+        # Checksum the segment as far as IP's length (and UDP's) covers it, with
+        # the pseudo header length taken from the IP header like scapy does
+        end = 14 + ip.len
+        if l4_type is TCP:
+            offset = 50
+        else:
+            offset = 40
+            end = min(end, 34 + l4.len)
+        buf[offset:offset + 2] = b'\0\0'
+        pseudo = src + dst + bytes((0, ip.proto)) + (ip.len - 20).to_bytes(2, 'big')
+        chksum = checksum(pseudo + bytes(buf[34:end]))
+        if chksum == 0 and l4_type is UDP:
+            chksum = 0xFFFF
+        buf[offset:offset + 2] = chksum.to_bytes(2, 'big')
+        return bytes(buf), wirelen
+    
+    def _write_raw(self, writer, packet, data, wirelen):
+        """Write rewritten bytes for packet with its original timestamp"""
+        if not writer.header_present:
+            writer.write_header(packet)
+        sec = int(packet.time)
+        usec = int(round((packet.time - sec) * 1000000))
+        writer.write_packet(data, sec=float(packet.time), usec=usec, wirelen=wirelen)
+    
+    def _remove_output(self, output_file):
+        """Remove an incomplete output file"""
+        if os.path.exists(output_file):
+            print(f"Removing incomplete output file: {output_file}")
+            try:
+                os.remove(output_file)
+            except OSError:
+                pass
+    
+    def _open_reader(self, input_file):
+        """Open a buffered streaming PcapReader (validates the capture header)"""
+        try:
+            input_fp = open(input_file, 'rb', buffering=self.read_buffer)
+            try:
+                return PcapReader(input_fp)
+            except BaseException:
+                input_fp.close()
+                raise
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"PCAP file not found: {input_file}")
+        except PermissionError as e:
+            raise PermissionError(f"Permission denied reading PCAP: {input_file}")
+        except Exception as e:
+            error_msg = str(e)
+            if "not a supported capture file" in error_msg.lower() or "truncated" in error_msg.lower():
+                raise ValueError(f"Invalid or corrupted PCAP file: {input_file} ({error_msg})")
+            raise ValueError(f"Failed to read PCAP file: {error_msg}")
+    
+    def _sanitize_stream(self, reader, writer, start=0, stop=None, failures=None):
+        """Sanitize and write packets start..stop-1 of a reader positioned at start
+        
+        Failed packets are skipped. Without a failures list they are reported here
+        and MAX_ERRORS of them raise; with one, (packet number, error) pairs are
+        appended for the caller and the range stops early at MAX_ERRORS.
+        Returns (packets read, packets written, packets skipped on errors).
+        """
+        packets_read = 0
+        packets_written = 0
+        errors_encountered = 0
+        next_progress = time.monotonic()
+        
+        packets = reader if stop is None else islice(reader, stop - start)
+        for i, packet in enumerate(packets, start):
+            packets_read += 1
+            # Check the clock every 256 packets and report progress by time
+            if not i & 0xFF and time.monotonic() >= next_progress:
+                print(f"Processing packet {i}...")
+                next_progress = time.monotonic() + PROGRESS_INTERVAL
+            
+            # Plain address-only packets skip scapy's field setters and rebuild
+            rewritten = self._rewrite_l2l3(packet)
+            if rewritten is not None:
+                self._write_raw(writer, packet, *rewritten)
+                packets_written += 1
+                continue
+            
+            try:
+                sanitized_packet = self.sanitize_packet(packet)
+            except Exception as e:
+                errors_encountered += 1
+                if failures is not None:
+                    failures.append((i, str(e)))
+                    if errors_encountered >= MAX_ERRORS:
+                        break  # the whole run is over the limit already
+                    continue
+                if errors_encountered <= MAX_ERROR_WARNINGS:
+                    print(f"Warning: Failed to sanitize packet {i}: {e}")
+                if errors_encountered >= MAX_ERRORS:
+                    raise RuntimeError(f"Too many errors encountered ({errors_encountered}). Stopping sanitization.")
+                # Skip the problematic packet
+                continue
+            
+            writer.write(sanitized_packet)
+            packets_written += 1
+        
+        return packets_read, packets_written, errors_encountered
+    
+    def _sanitize_parallel(self, reader, input_file, output_file, jobs):
+        """Sanitize contiguous packet ranges in worker processes and join their output in order"""
+        # Count packets first so every worker gets an equal range
+        with reader:
+            total = _skip_packets(reader)
+        if total == 0:
+            return 0, 0, 0
+        
+        jobs = min(jobs, total)
+        bounds = [total * i // jobs for i in range(jobs + 1)]
+        print(f"Sanitizing {total} packets in {jobs} processes...")
+        
+        # Parts go next to the output so joining them never crosses filesystems
+        part_dir = tempfile.mkdtemp(prefix='.sanitize-', dir=os.path.dirname(output_file) or '.')
+        try:
+            parts = [os.path.join(part_dir, f"part{i}.pcap") for i in range(jobs)]
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                shards = list(pool.map(_sanitize_shard, [self] * jobs, [input_file] * jobs,
+                                       parts, bounds[:-1], bounds[1:]))
+            
+            # Report failures in packet order and apply the error limit to the whole
+            # capture, as a single-process run would
+            failures = [failure for *_, shard_failures in shards for failure in shard_failures]
+            for i, error in failures[:MAX_ERROR_WARNINGS]:
+                print(f"Warning: Failed to sanitize packet {i}: {error}")
+            if len(failures) >= MAX_ERRORS:
+                raise RuntimeError(f"Too many errors encountered ({MAX_ERRORS}). Stopping sanitization.")
+            
+            packets_read = packets_written = errors_encountered = 0
+            for stats, ip_map, mac_map, domain_map, (read, written, errors), _ in shards:
+                for key, value in stats.items():
+                    if key != 'total_packets':
+                        self.stats[key] += value
+                self.ip_map.update(ip_map)
+                self.mac_map.update(mac_map)
+                self.domain_map.update(domain_map)
+                packets_read += read
+                packets_written += written
+                errors_encountered += errors
+            self.stats['total_packets'] += packets_read
+            
+            if packets_written:
+                _join_pcap_parts(parts, output_file)
+        finally:
+            shutil.rmtree(part_dir, ignore_errors=True)
+        
+        return packets_read, packets_written, errors_encountered
+    
+    def sanitize_file(self, input_file, output_file, jobs=1):
+        """Sanitize entire PCAP file with comprehensive error handling
+        
+        jobs > 1 sanitizes contiguous packet ranges in that many processes.
+        """
         try:
             # Validate input file exists
             if not os.path.exists(input_file):
@@ -294,63 +609,41 @@ class PCAPSanitizer:
                 raise PermissionError(f"Cannot write to output directory (permission denied): {output_dir}")
             
             print(f"Reading PCAP file: {input_file}")
-            print("This may take a while for large files...")
-            
-            # Read PCAP file with error handling
-            try:
-                packets = rdpcap(input_file)
-            except FileNotFoundError as e:
-                raise FileNotFoundError(f"PCAP file not found: {input_file}")
-            except PermissionError as e:
-                raise PermissionError(f"Permission denied reading PCAP: {input_file}")
-            except Exception as e:
-                error_msg = str(e)
-                if "not a supported capture file" in error_msg.lower() or "truncated" in error_msg.lower():
-                    raise ValueError(f"Invalid or corrupted PCAP file: {input_file} ({error_msg})")
-                raise ValueError(f"Failed to read PCAP file: {error_msg}")
-            
-            if not packets or len(packets) == 0:
-                raise ValueError(f"No packets found in PCAP file: {input_file}")
+            print(f"Writing sanitized PCAP to: {output_file}")
             
-            print(f"Loaded {len(packets)} packets")
+            # Packets are sanitized and written one at a time instead of held in memory
+            reader = self._open_reader(input_file)
             
             # Sanitize packets with progress tracking
-            sanitized_packets = []
-            errors_encountered = 0
-            max_errors = 100  # Stop if too many errors
-            
-            for i, packet in enumerate(packets):
-                if i % 1000 == 0:
-                    print(f"Processing packet {i}/{len(packets)}...")
-                
-                try:
-                    sanitized_packet = self.sanitize_packet(packet)
-                    sanitized_packets.append(sanitized_packet)
-                except Exception as e:
-                    errors_encountered += 1
-                    if errors_encountered <= 10:  # Only print first 10 errors
-                        print(f"Warning: Failed to sanitize packet {i}: {e}")
-                    if errors_encountered >= max_errors:
-                        raise RuntimeError(f"Too many errors encountered ({errors_encountered}). Stopping sanitization.")
-                    # Skip the problematic packet
-                    continue
-            
-            if not sanitized_packets:
-                raise ValueError("No packets could be successfully sanitized")
-            
-            if errors_encountered > 0:
-                print(f"\nWarning: {errors_encountered} packets could not be sanitized and were skipped")
-            
-            # Write output file with error handling
-            print(f"\nWriting sanitized PCAP to: {output_file}")
+            completed = False
             try:
-                wrpcap(output_file, sanitized_packets)
+                if jobs > 1:
+                    packets_read, packets_written, errors_encountered = self._sanitize_parallel(
+                        reader, input_file, output_file, jobs)
+                else:
+                    with reader, PcapWriter(output_file, sync=False, bufsz=WRITE_BUFFER) as writer:
+                        packets_read, packets_written, errors_encountered = self._sanitize_stream(reader, writer)
+                
+                if packets_read == 0:
+                    raise ValueError(f"No packets found in PCAP file: {input_file}")
+                
+                if packets_written == 0:
+                    raise ValueError("No packets could be successfully sanitized")
+                completed = True
             except PermissionError:
                 raise PermissionError(f"Permission denied writing output file: {output_file}")
             except OSError as e:
                 if "No space left" in str(e) or "Disk quota exceeded" in str(e):
                     raise OSError(f"Insufficient disk space to write output file: {output_file}")
                 raise OSError(f"Failed to write output file: {e}")
+            finally:
+                # Don't leave a partial capture behind on errors or Ctrl+C
+                if not completed:
+                    self._remove_output(output_file)
+            
+            print(f"\nProcessed {packets_read} packets")
+            if errors_encountered > 0:
+                print(f"\nWarning: {errors_encountered} packets could not be sanitized and were skipped")
             
             # Verify output file was created successfully
             if not os.path.exists(output_file):
@@ -389,12 +682,6 @@ class PCAPSanitizer:
             return False
         except KeyboardInterrupt:
             print(f"\n\n❌ Operation cancelled by user", file=sys.stderr)
-            if os.path.exists(output_file):
-                print(f"Removing incomplete output file: {output_file}")
-                try:
-                    os.remove(output_file)
-                except:
-                    pass
             return False
         except Exception as e:
             print(f"\n❌ Unexpected error during sanitization: {e}", file=sys.stderr)
@@ -419,6 +706,15 @@ Examples:
   
   # Auto-generate output filename
   python sanitize_pcap.py --input capture.cap
+  
+  # Keep the SHA-256 pseudonyms of earlier releases
+  python sanitize_pcap.py --input capture.cap --output sanitized.cap --crypto-hash
+  
+  # Sanitize a large capture in 4 processes
+  python sanitize_pcap.py --input capture.cap --jobs 4
+  
+  # Read multi-GB captures with a 4 MiB input buffer
+  python sanitize_pcap.py --input capture.cap --read-buffer 4194304
         """
     )
     
@@ -446,8 +742,37 @@ Examples:
         help='Anonymize all IPs including private ranges'
     )
     
+    parser.add_argument(
+        '--read-buffer',
+        type=int,
+        default=DEFAULT_READ_BUFFER,
+        metavar='BYTES',
+        help=f'Input file read buffer size in bytes (default: {DEFAULT_READ_BUFFER})'
+    )
+    
+    parser.add_argument(
+        '--crypto-hash',
+        action='store_true',
+        help='Derive pseudonyms from SHA-256 instead of BLAKE2b (matches output of earlier releases)'
+    )
+    
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Worker processes for sanitization (default: 1)'
+    )
+    
     args = parser.parse_args()
     
+    if args.jobs < 1:
+        print("❌ Error: --jobs must be at least 1", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.read_buffer < 1:
+        print("❌ Error: --read-buffer must be at least 1 byte", file=sys.stderr)
+        sys.exit(1)
+    
     input_file = args.input
     
     if not os.path.exists(input_file):
@@ -491,8 +816,9 @@ Examples:
         print("\n")
         
         # Perform sanitization
-        sanitizer = PCAPSanitizer(preserve_internal_ips=preserve_ips)
-        success = sanitizer.sanitize_file(input_file, output_file)
+        sanitizer = PCAPSanitizer(preserve_internal_ips=preserve_ips, read_buffer=args.read_buffer,
+                                  crypto_hash=args.crypto_hash)
+        success = sanitizer.sanitize_file(input_file, output_file, jobs=args.jobs)
         
         # Exit with appropriate code
         if success: